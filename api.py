@@ -0,0 +1,669 @@
+"""Headless JSON API over the planner data.
+
+Run with `python api.py` (defaults to http://127.0.0.1:8502). It reads and
+writes the same per-user data files as the Streamlit pages, through the
+same Store and index code, so a quick "log ₹200 Food" from a phone
+shortcut or a cron job never renders a page. The indexes it keeps are its
+own process's copies; like the pages' copies they are rebuilt whenever
+the file changed underneath them.
+
+Each request holds Store.locked() from load to save, so API writes never
+overwrite each other. The pages don't take that lock (a script rerun
+can't hold it across clicks), so an edit racing a page save can still
+be lost; see loadtest.py.
+
+Pick the user with an `X-Planner-User` header or `?user=`; no user means
+the shared data.json, exactly like the UI.
+
+    GET    /dashboard
+    GET    /expenses?from=&to=&category=     POST /expenses
+    PATCH  /expenses/<id or i>               DELETE /expenses/<id or i>
+    GET    /days/<date>                      POST /days/<date>/<tasks|habits>
+    PATCH  /days/<date>/<tasks|habits>/<i or text>
+    DELETE /days/<date>/<tasks|habits>/<i or text>
+    GET    /budgets                          PUT/DELETE /budgets/<year>/<month>
+    GET    /wishlist                         POST /wishlist
+    PATCH  /wishlist/<id>                    DELETE /wishlist/<id>
+    GET    /snapshots?limit=                 GET /changes?since=<version>
+"""
+import argparse, asyncio, json, logging, re, uuid
+from contextlib import ExitStack
+from datetime import date, timedelta
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from utils.alerts import BUDGET_RULES, evaluate, monthly_budget
+from utils.categorizer import CATEGORIES, DEFAULT_RULES, get_categorizer
+from utils.fx import BASE_CURRENCY, currencies, rates_version, to_base
+from utils.habits import habit_state
+from utils.pending import pending_state
+from utils.planner import MONTHS
+from utils.recurring import materialize_day, sync_recurring_expenses
+from utils.spend_index import spend_state
+from utils.store import StorePool, ensure_ids
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+pool = StorePool()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==================================================
+# 📦 REQUEST CONTEXT
+# ==================================================
+class Request:
+    """One call: the user's store, their data and the shared state touched.
+
+    Shared states are fetched before anything is changed, so a stale one is
+    rebuilt from the data as it was on disk; after the save every touched
+    state gets the new version, same as the pages do. Each touched state's
+    lock is held until the request is done (handlers take them in the
+    pages' order: spend, pending, habits).
+    """
+
+    def __init__(self, store, query, body):
+        self.store = store
+        self.query = query
+        self.body = body
+        self.data = _load(store)
+        self.version = _version(store)
+        self.touched = []
+        self._held = ExitStack()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._held.close()
+
+    def _track(self, state):
+        if state not in self.touched:
+            self._held.enter_context(state["lock"])
+            self.touched.append(state)
+        return state
+
+    def spend(self):
+        return self._track(spend_state(self.store.key, self.data["expenses"], self.version))["index"]
+
+    def pending(self):
+        return self._track(pending_state(self.store.key, self.data["weeks"], self.version))["index"]
+
+    def habits(self):
+        return self._track(habit_state(self.store.key, self.data["weeks"], self.version))["stats"]
+
+    def save(self):
+        self.store.save(self.data)
+        version = _version(self.store)
+        for state in self.touched:
+            state["version"] = version
+
+
+def _version(store):
+    # the pages' data_version(): the file plus the rate file behind totals
+    return (*store.version(), rates_version())
+
+
+def _load(store):
+    data = store.load() or {}
+    data.setdefault("weeks", {})
+    data.setdefault("expenses", [])
+    data.setdefault("savings", [])
+    data.setdefault("wishlist", [])
+    data.setdefault("recurring", [])
+    data.setdefault("alert_rules", [])
+    data.setdefault("alerts", {})
+    data["savings"] = [s for s in data["savings"] if isinstance(s, dict)]
+    data["wishlist"] = [w for w in data["wishlist"] if isinstance(w, dict)]
+    # stable ids, saved straight away as the pages do, so the ids a GET
+    # returns still match on the next PATCH / DELETE
+    if ensure_ids(data["wishlist"]) | ensure_ids(data["expenses"]):
+        store.save(data)
+    return data
+
+
+# ---------- VALIDATION ----------
+def _date(value, field="date"):
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ApiError(400, f"{field} must be YYYY-MM-DD")
+
+
+def _amount(value, field="amount"):
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{field} must be a number")
+    if amount <= 0:
+        raise ApiError(400, f"{field} must be positive")
+    return int(amount) if amount.is_integer() else amount
+
+
+def _category(value):
+    # the pages only know these; anything else breaks the edit form
+    category = str(value or "Other").strip().capitalize()
+    if category not in CATEGORIES:
+        raise ApiError(400, f"category must be one of {', '.join(CATEGORIES)}")
+    return category
+
+
+def _currency(value):
+    currency = (value or BASE_CURRENCY).upper()
+    if currency not in currencies():
+        raise ApiError(400, f"unknown currency {currency}")
+    return currency
+
+
+def _index(items, ref, what):
+    try:
+        i = int(ref)
+    except ValueError:
+        raise ApiError(404, f"no {what} {ref}")
+    if not 0 <= i < len(items):
+        raise ApiError(404, f"no {what} {ref}")
+    return i
+
+
+# ==================================================
+# 💸 EXPENSES
+# ==================================================
+def _expense(expenses, ref):
+    # stable id first; a bare number is still taken as a list position
+    for i, e in enumerate(expenses):
+        if e.get("id") == ref:
+            return i
+    return _index(expenses, ref, "expense")
+
+
+def list_expenses(req):
+    start = _date(req.query["from"], "from") if "from" in req.query else None
+    end = _date(req.query["to"], "to") if "to" in req.query else None
+    category = req.query.get("category")
+
+    rows = []
+    for i, e in enumerate(req.data["expenses"]):
+        d = str(e.get("date", ""))[:10]
+        if start and d < start.isoformat() or end and d > end.isoformat():
+            continue
+        if category and e.get("category") != category:
+            continue
+        rows.append(dict(e, index=i))
+    return 200, rows
+
+
+def add_expense(req):
+    body = req.body
+    amount = _amount(body.get("amount"))
+    currency = _currency(body.get("currency"))
+    day = _date(body.get("date", date.today().isoformat()))
+    note = str(body.get("note") or "").strip()
+    if body.get("category"):
+        category = _category(body["category"])
+    else:
+        rules = req.data.get("category_rules") or DEFAULT_RULES
+        category = get_categorizer(rules).classify(note, "Other")
+
+    expense = {"id": uuid.uuid4().hex, "amount": amount, "category": category, "date": day.isoformat()}
+    if note:
+        expense["note"] = note
+    if currency != BASE_CURRENCY:
+        expense["currency"] = currency
+
+    index = req.spend()
+    req.data["expenses"].append(expense)
+    index.add(expense["date"], category, amount, currency)
+    evaluate(req.data, index, day, {category})
+    req.save()
+    return 201, dict(expense, index=len(req.data["expenses"]) - 1)
+
+
+def update_expense(req, ref):
+    expenses = req.data["expenses"]
+    i = _expense(expenses, ref)
+    old = expenses[i]
+    new = dict(old)
+    if "amount" in req.body:
+        new["amount"] = _amount(req.body["amount"])
+    if "date" in req.body:
+        new["date"] = _date(req.body["date"]).isoformat()
+    if "category" in req.body:
+        new["category"] = _category(req.body["category"])
+    if "note" in req.body:
+        new.pop("note", None)
+        if str(req.body["note"] or "").strip():
+            new["note"] = str(req.body["note"]).strip()
+    if "currency" in req.body:
+        new.pop("currency", None)
+        currency = _currency(req.body["currency"])
+        if currency != BASE_CURRENCY:
+            new["currency"] = currency
+
+    index = req.spend()
+    index.add(old["date"], old["category"], -old["amount"], old.get("currency"))
+    index.add(new["date"], new["category"], new["amount"], new.get("currency"))
+    expenses[i] = new
+    evaluate(req.data, index, old["date"], {old["category"]})
+    evaluate(req.data, index, new["date"], {new["category"]})
+    req.save()
+    return 200, dict(new, index=i)
+
+
+def delete_expense(req, ref):
+    i = _expense(req.data["expenses"], ref)
+    index = req.spend()
+    removed = req.data["expenses"].pop(i)
+    index.add(removed["date"], removed["category"], -removed["amount"], removed.get("currency"))
+    evaluate(req.data, index, removed["date"], {removed["category"]})
+    req.save()
+    return 200, removed
+
+
+# ==================================================
+# ✅ TASKS & HABITS
+# ==================================================
+def _day(req, day_key):
+    """The day's dict, created and given its recurring items if needed."""
+    d = _date(day_key)
+    week_key = (d - timedelta(days=d.weekday())).isoformat()
+    week = req.data["weeks"].setdefault(week_key, {})
+    day = week.setdefault(d.isoformat(), {"habits": [], "tasks": []})
+    materialize_day(req.data["recurring"], d.isoformat(), day)
+    return d.isoformat(), day
+
+
+def _entry(items, ref, kind):
+    if ref.isdigit():
+        return _index(items, ref, kind[:-1])
+    text = unquote(ref).strip().lower()
+    for i, item in enumerate(items):
+        if item.get("text", "").strip().lower() == text:
+            return i
+    raise ApiError(404, f"no {kind[:-1]} {text!r}")
+
+
+def _kind(kind):
+    if kind not in ("tasks", "habits"):
+        raise ApiError(404, "use /tasks or /habits")
+    return kind
+
+
+def _save_day(req, day_key, day):
+    pending, habits = req.pending(), req.habits()
+    pending.update_day(day_key, day)
+    habits.update_day(day_key, day)
+    req.save()
+
+
+def get_day(req, day_key):
+    day_key, day = _day(req, day_key)
+    return 200, {"date": day_key, "habits": day.get("habits", []), "tasks": day.get("tasks", [])}
+
+
+def add_entry(req, day_key, kind):
+    kind = _kind(kind)
+    text = str(req.body.get("text") or "").strip()
+    if not text:
+        raise ApiError(400, "text is required")
+    req.pending(), req.habits()
+    day_key, day = _day(req, day_key)
+    entry = {"text": text, "done": bool(req.body.get("done", False))}
+    day.setdefault(kind, []).append(entry)
+    _save_day(req, day_key, day)
+    return 201, dict(entry, index=len(day[kind]) - 1)
+
+
+def update_entry(req, day_key, kind, ref):
+    kind = _kind(kind)
+    req.pending(), req.habits()
+    day_key, day = _day(req, day_key)
+    items = day.setdefault(kind, [])
+    i = _entry(items, ref, kind)
+    if "text" in req.body:
+        text = str(req.body["text"] or "").strip()
+        if not text:
+            raise ApiError(400, "text cannot be empty")
+        items[i]["text"] = text
+    if "done" in req.body:
+        items[i]["done"] = bool(req.body["done"])
+    _save_day(req, day_key, day)
+    return 200, dict(items[i], index=i)
+
+
+def delete_entry(req, day_key, kind, ref):
+    kind = _kind(kind)
+    req.pending(), req.habits()
+    day_key, day = _day(req, day_key)
+    items = day.setdefault(kind, [])
+    removed = items.pop(_entry(items, ref, kind))
+    _save_day(req, day_key, day)
+    return 200, removed
+
+
+# ==================================================
+# 💰 BUDGETS
+# ==================================================
+def _month(year, month):
+    try:
+        year = int(year)
+    except ValueError:
+        raise ApiError(400, "year must be a number")
+    if month.isdigit() and 1 <= int(month) <= 12:
+        return year, MONTHS[int(month) - 1]
+    name = month.capitalize()
+    if name not in MONTHS:
+        raise ApiError(400, "month must be 1-12 or a month name")
+    return year, name
+
+
+def list_budgets(req):
+    return 200, sorted(
+        req.data["savings"],
+        key=lambda s: (int(s.get("year", 0)), MONTHS.index(s["month"]) if s.get("month") in MONTHS else 12)
+    )
+
+
+def set_budget(req, year, month):
+    year, month = _month(year, month)
+    budget = _amount(req.body.get("budget"), "budget")
+    if not isinstance(budget, int):
+        # the Savings page edits budgets in whole rupees
+        raise ApiError(400, "budget must be a whole number")
+    index = req.spend()
+    req.data["savings"] = [
+        s for s in req.data["savings"]
+        if not (s.get("month") == month and s.get("year") == year)
+    ]
+    entry = {"month": month, "year": year, "budget": budget}
+    req.data["savings"].append(entry)
+    evaluate(req.data, index, date(year, MONTHS.index(month) + 1, 1), kinds=BUDGET_RULES)
+    req.save()
+    return 200, entry
+
+
+def delete_budget(req, year, month):
+    year, month = _month(year, month)
+    keep = [s for s in req.data["savings"] if not (s.get("month") == month and s.get("year") == year)]
+    if len(keep) == len(req.data["savings"]):
+        raise ApiError(404, f"no budget for {month} {year}")
+    index = req.spend()
+    req.data["savings"] = keep
+    evaluate(req.data, index, date(year, MONTHS.index(month) + 1, 1), kinds=BUDGET_RULES)
+    req.save()
+    return 200, {"month": month, "year": year}
+
+
+# ==================================================
+# 🛍 WISHLIST
+# ==================================================
+WISH_FIELDS = ("item", "price", "specs", "brand", "priority", "category", "url")
+
+
+def _wish(req, item_id):
+    for i, item in enumerate(req.data["wishlist"]):
+        if item["id"] == item_id:
+            return i
+    raise ApiError(404, f"no wishlist item {item_id}")
+
+
+def _wish_fields(body, entry):
+    for field in WISH_FIELDS:
+        if field in body:
+            entry[field] = body[field]
+    if "price" in body:
+        entry["price"] = _amount(body["price"], "price")
+    if "currency" in body:
+        entry.pop("currency", None)
+        currency = _currency(body["currency"])
+        if currency != BASE_CURRENCY:
+            entry["currency"] = currency
+    if not str(entry.get("item") or "").strip():
+        raise ApiError(400, "item is required")
+    entry["item"] = entry["item"].strip()
+    return entry
+
+
+def list_wishlist(req):
+    return 200, req.data["wishlist"]
+
+
+def add_wish(req):
+    entry = {"item": "", "price": 0, "specs": "", "brand": "", "priority": "Want", "category": "Other", "url": ""}
+    entry = _wish_fields(req.body, entry)
+    entry["id"] = uuid.uuid4().hex
+    req.data["wishlist"].append(entry)
+    req.save()
+    return 201, entry
+
+
+def update_wish(req, item_id):
+    i = _wish(req, item_id)
+    req.data["wishlist"][i] = _wish_fields(req.body, dict(req.data["wishlist"][i]))
+    req.save()
+    return 200, req.data["wishlist"][i]
+
+
+def delete_wish(req, item_id):
+    removed = req.data["wishlist"].pop(_wish(req, item_id))
+    req.save()
+    return 200, removed
+
+
+# ==================================================
+# 🗄 BACKUPS
+# ==================================================
+def list_snapshots(req):
+    try:
+        limit = int(req.query.get("limit", 50))
+    except ValueError:
+        raise ApiError(400, "limit must be a number")
+    return 200, [
+        {"version": v, "time": t, "changed": n}
+        for v, t, n in req.store.backups.history(limit=limit)
+    ]
+
+
+def changes(req):
+    backups = req.store.backups
+    try:
+        since = int(req.query.get("since", 0))
+        return 200, backups.changes_since(since)
+    except (ValueError, KeyError):
+        raise ApiError(400, f"since must be a version between 0 and {backups.latest()}")
+
+
+# ==================================================
+# 📊 DASHBOARD
+# ==================================================
+def dashboard(req):
+    data = req.data
+    today = date.today()
+    today_key = today.isoformat()
+
+    index, pending, habits = req.spend(), req.pending(), req.habits()
+
+    # recurring expenses due up to today count, same as on the dashboard page
+    if sync_recurring_expenses(data, index, today):
+        req.save()
+
+    total_tasks = completed_tasks = 0
+    for week in data["weeks"].values():
+        for day in week.values():
+            if isinstance(day, dict):
+                tasks = day.get("tasks", [])
+                total_tasks += len(tasks)
+                completed_tasks += sum(1 for t in tasks if t.get("done") is True)
+
+    month_start = today.replace(day=1)
+    prev_end = month_start - timedelta(days=1)
+    prev_start = prev_end.replace(day=1)
+    prev_same_day = prev_start.replace(day=min(today.day, prev_end.day))
+    budget = monthly_budget(data, today)
+    this_month = index.total(month_start, today)
+
+    wish_prices = to_base(
+        [w.get("price") for w in data["wishlist"]],
+        [w.get("currency") for w in data["wishlist"]],
+        [today] * len(data["wishlist"])
+    )
+
+    return 200, {
+        "tasks": {"total": total_tasks, "completed": completed_tasks},
+        "spending": {
+            "total": round(float(sum(to_base(
+                [e.get("amount") for e in data["expenses"]],
+                [e.get("currency") for e in data["expenses"]],
+                [e.get("date") for e in data["expenses"]]
+            ))), 2),
+            "this_month": round(this_month, 2),
+            "last_month_to_date": round(index.total(prev_start, prev_same_day), 2),
+            "by_category": index.category_totals(month_start, today),
+            "budget": budget,
+            "remaining": round(budget - this_month, 2) if budget else None
+        },
+        "pending": {
+            "upcoming": [{"date": d, "text": text} for d, _, text in pending.upcoming(today_key, 5)],
+            "overdue": pending.overdue_count(today_key)
+        },
+        "habits": habits.summary(today),
+        "alerts": sorted(data["alerts"].values(), key=lambda a: a.get("date", ""), reverse=True),
+        "wishlist": {"items": len(data["wishlist"]), "total_cost": round(float(sum(wish_prices)), 2)}
+    }
+
+
+# ==================================================
+# 🧭 ROUTING
+# ==================================================
+ROUTES = [
+    ("GET", r"/dashboard", dashboard),
+    ("GET", r"/expenses", list_expenses),
+    ("POST", r"/expenses", add_expense),
+    ("PATCH", r"/expenses/([^/]+)", update_expense),
+    ("DELETE", r"/expenses/([^/]+)", delete_expense),
+    ("GET", r"/days/([^/]+)", get_day),
+    ("POST", r"/days/([^/]+)/([^/]+)", add_entry),
+    ("PATCH", r"/days/([^/]+)/([^/]+)/([^/]+)", update_entry),
+    ("DELETE", r"/days/([^/]+)/([^/]+)/([^/]+)", delete_entry),
+    ("GET", r"/budgets", list_budgets),
+    ("PUT", r"/budgets/([^/]+)/([^/]+)", set_budget),
+    ("DELETE", r"/budgets/([^/]+)/([^/]+)", delete_budget),
+    ("GET", r"/wishlist", list_wishlist),
+    ("POST", r"/wishlist", add_wish),
+    ("PATCH", r"/wishlist/([^/]+)", update_wish),
+    ("DELETE", r"/wishlist/([^/]+)", delete_wish),
+    ("GET", r"/snapshots", list_snapshots),
+    ("GET", r"/changes", changes),
+]
+ROUTES = [(method, re.compile(pattern + "/?"), handler) for method, pattern, handler in ROUTES]
+
+
+def dispatch(method, target, headers, raw_body):
+    """(status, payload) for one request. Runs off the event loop."""
+    url = urlsplit(target)
+    query = dict(parse_qsl(url.query))
+
+    matched = False
+    for route_method, pattern, handler in ROUTES:
+        m = pattern.fullmatch(url.path)
+        if not m:
+            continue
+        matched = True
+        if route_method != method:
+            continue
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            raise ApiError(400, "body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "body must be a JSON object")
+
+        store = pool.get(headers.get("x-planner-user") or query.get("user", ""))
+        # held from load to save, so API writes (from any process) never
+        # overwrite each other
+        with store.locked(), Request(store, query, body) as req:
+            return handler(req, *m.groups())
+
+    raise ApiError(405 if matched else 404, "method not allowed" if matched else "not found")
+
+
+# ==================================================
+# 🌐 HTTP SERVER
+# ==================================================
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ApiError(400, "malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise ApiError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+async def handle(reader, writer):
+    try:
+        request = await _read_request(reader)
+        if request is None:
+            writer.close()
+            return
+        # file I/O and index updates run in a worker thread; the per-store
+        # lock keeps writes for one user in order
+        status, payload = await asyncio.to_thread(dispatch, *request)
+    except ApiError as e:
+        status, payload = e.status, {"error": str(e)}
+    except Exception as e:
+        status, payload = 500, {"error": repr(e)}
+
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + body
+    )
+    try:
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(host, port):
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Planner API on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless JSON API for the life planner")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    # the shared caches work fine outside a Streamlit run; skip its bare-mode warnings
+    for name in ("streamlit.runtime.caching.cache_data_api",
+                 "streamlit.runtime.scriptrunner_utils.script_run_context"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -1,7 +1,19 @@
 import streamlit as st
-import json, os
+import json
+from datetime import date, timedelta
 import pandas as pd
 import plotly.express as px
+from utils.global_search import GlobalSearch
+from utils.pending import pending_state
+from utils.habits import habit_state
+from utils.spend_index import spend_state
+from utils.forecast import cached_forecast
+from utils.recurring import sync_recurring_expenses
+from utils.timeseries import cached_timeline
+from utils.heatmap import cached_day_arrays, data_years, year_grid
+from utils.fx import rates_version, symbol, to_base
+from utils.store import POOL_SIZE, current_store, ensure_ids
+import plotly.graph_objects as go
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
@@ -15,10 +27,11 @@ with open("styles/dark_purple.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 # ---------- DATA ----------
-DATA_FILE = "data.json"
+store = current_store()
+DATA_FILE = store.path
 
 def load_data():
-    if not os.path.exists(DATA_FILE):
+    if not store.exists():
         return {
             "weeks": {},
             "expenses": [],
@@ -26,18 +39,42 @@ def load_data():
             "wishlist": []
         }
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    data = store.load()
 
     data.setdefault("weeks", {})
     data.setdefault("expenses", [])
     data.setdefault("savings", [])
     data.setdefault("wishlist", [])
 
+    # stable expense ids keep search doc ids put when rows are deleted
+    if ensure_ids(data["expenses"]):
+        save_data(data)
+
     return data
 
+def save_data(data):
+    store.save(data)
+
+def data_version():
+    # totals are in base currency, so a rate file update counts as a change
+    return (*store.version(), rates_version())
+
 data = load_data()
 
+# recurring expenses due up to today, so every total below includes them
+spend = spend_state(store.key, data["expenses"], data_version())
+with spend["lock"]:
+    if sync_recurring_expenses(data, spend["index"], date.today()):
+        save_data(data)
+        spend["version"] = data_version()
+
+@st.cache_resource(max_entries=POOL_SIZE)
+def global_search(path):
+    return GlobalSearch(path)
+
+search = global_search(DATA_FILE)
+search.sync(data, data_version())
+
 # ==================================================
 # ✅ TASKS (CORRECT)
 # ==================================================
@@ -71,8 +108,24 @@ expenses_df["date"] = pd.to_datetime(
 # Display-only formatted date
 expenses_df["date_display"] = expenses_df["date"].dt.strftime("%d-%m-%Y")
 
+# 💱 everything below is in ₹, converted at each expense's as-of rate
+expenses_df["amount"] = to_base(
+    expenses_df["amount"], expenses_df.get("currency"), expenses_df["date"]
+)
+
 total_expenses = expenses_df["amount"].sum() if not expenses_df.empty else 0
 
+# month-to-date vs the same days of last month, straight from prefix sums
+spend_index = spend["index"]
+today = date.today()
+month_start = today.replace(day=1)
+prev_end = month_start - timedelta(days=1)
+prev_start = prev_end.replace(day=1)
+prev_same_day = prev_start.replace(day=min(today.day, prev_end.day))
+
+this_month_spent = spend_index.total(month_start, today)
+last_month_spent = spend_index.total(prev_start, prev_same_day)
+
 
 
 
@@ -111,6 +164,18 @@ progress = (
     if latest_budget > 0 else 0
 )
 
+# on track / at risk for the current month's budget
+current_budget = next(
+    (
+        s["budget"] for s in data["savings"]
+        if s.get("month") == today.strftime("%B") and s.get("year") == today.year
+    ),
+    None
+)
+projected_spend = cached_forecast(
+    data_version(), today.year, today, data["expenses"]
+).loc[today.month, "projected"]
+
 # ==================================================
 # ✅ WISHLIST
 # ==================================================
@@ -122,12 +187,56 @@ wishlist_count = len(data["wishlist"])
 st.markdown("## 💜 Life Planner Dashboard")
 st.caption("Your personal Notion-style system")
 
-c1, c2, c3, c4 = st.columns(4)
+# ==================================================
+# 🔎 GLOBAL SEARCH
+# ==================================================
+query = st.text_input("🔎 Search tasks, habits, expenses and wishlist", placeholder="e.g. workout")
+
+if query.strip():
+    hits = search.search(query)
+
+    if not hits:
+        st.info("Nothing found")
+
+    this_monday = date.today() - timedelta(days=date.today().weekday())
+
+    for i, hit in enumerate(hits):
+        h1, h2 = st.columns([5, 1])
+
+        if hit["kind"] in ("task", "habit"):
+            status = "✅" if hit["done"] else "⏳"
+            h1.write(f"{status} **{hit['text']}** · {hit['kind']} · {hit['date']}")
+            if h2.button("Open", key=f"search_open_{i}"):
+                week_start = date.fromisoformat(hit["week"])
+                st.session_state.week_offset = (week_start - this_monday).days // 7
+                st.switch_page("pages/1_Daily_Tasks.py")
+
+        elif hit["kind"] == "expense":
+            h1.write(f"💸 **{symbol(hit.get('currency'))}{hit['amount']}** · {hit['category']} · {hit['date']}")
+            if h2.button("Open", key=f"search_open_{i}") and hit["date"]:
+                st.session_state.daily_date = date.fromisoformat(hit["date"])
+                st.switch_page("pages/2_Expenses.py")
+
+        else:
+            h1.write(f"🛍 **{hit['item']}** · wishlist")
+            if h2.button("Open", key=f"search_open_{i}"):
+                st.session_state.wishlist_query = hit["item"]
+                st.switch_page("pages/4_Wishlist.py")
+
+st.divider()
+
+c1, c2, c3, c4, c5 = st.columns(5)
 
 c1.metric("📋 Total Tasks", total_tasks)
 c2.metric("✅ Completed Tasks", completed_tasks)
 c3.metric("💸 Total Expenses", f"₹{int(total_expenses)}")
-c4.metric("🛒 Wishlist Items", wishlist_count)
+c4.metric(
+    "📆 This Month",
+    f"₹{int(this_month_spent)}",
+    delta=f"₹{int(this_month_spent - last_month_spent)} vs last month",
+    delta_color="inverse"
+)
+c5.metric("🛒 Wishlist Items", wishlist_count)
 
 st.divider()
 
@@ -162,12 +271,46 @@ with right:
         st.progress(min(max(progress, 0), 1))
 
         if overspent_amount > 0:
-            st.error(f"⚠ Overspent by ₹{overspent_amount}")
+            st.error(f"⚠ Overspent by ₹{overspent_amount:,.0f}")
+        else:
+            st.success(f"💜 Saved ₹{saved_amount:,.0f} out of ₹{latest_budget:,}")
+
+    if current_budget:
+        if projected_spend <= current_budget:
+            st.success(f"🟢 On track: projected ₹{projected_spend:,.0f} of ₹{current_budget} this month")
         else:
-            st.success(f"💜 Saved ₹{saved_amount} out of ₹{latest_budget}")
+            st.warning(f"🔴 At risk: projected ₹{projected_spend:,.0f} vs ₹{current_budget} budget")
+
+# ==================================================
+# 📈 SPENDING TIMELINE
+# ==================================================
+timeline = cached_timeline(data_version(), "W", 1000, data["expenses"])
+
+if not timeline.empty:
+    st.divider()
+    st.subheader("📈 Weekly Spending")
+    st.plotly_chart(
+        px.line(timeline, x="date", y="amount", labels={"amount": "Amount (₹)", "date": ""}),
+        use_container_width=True
+    )
 
 st.divider()
 
+# ==================================================
+# 🚨 ALERTS
+# ==================================================
+active_alerts = sorted(
+    data.get("alerts", {}).values(),
+    key=lambda a: a.get("date", ""),
+    reverse=True
+)
+
+if active_alerts:
+    st.subheader("🚨 Alerts")
+    for alert in active_alerts[:5]:
+        st.warning(alert["message"])
+    st.divider()
+
 # ==================================================
 # 📝 PENDING TASKS
 # ==================================================
@@ -176,16 +319,23 @@ left, right = st.columns(2)
 with left:
     st.subheader("📝 Pending Tasks")
 
-    if total_tasks == completed_tasks:
+    pending = pending_state(store.key, data["weeks"], data_version())["index"]
+    today_key = date.today().isoformat()
+
+    if len(pending) == 0:
         st.success("All tasks completed 🎉")
     else:
-        shown = 0
-        for week in data["weeks"].values():
-            for day in week.values():
-                for t in day.get("tasks", []):
-                    if not t.get("done") and shown < 5:
-                        st.write("•", t.get("text"))
-                        shown += 1
+        overdue = pending.overdue_count(today_key)
+        if overdue:
+            st.warning(f"⏰ {overdue} overdue task(s)")
+
+        upcoming = pending.upcoming(today_key, k=5)
+        if not upcoming:
+            st.info("Nothing due from today on")
+
+        for day_key, _, text in upcoming:
+            due = date.fromisoformat(day_key).strftime("%a %d %b")
+            st.write("•", text, f"· {due}")
 
 # ==================================================
 # 🛍 WISHLIST PREVIEW
@@ -195,6 +345,115 @@ with right:
 
     if data["wishlist"]:
         for item in data["wishlist"][:5]:
-            st.write(f"• {item.get('item')} – ₹{item.get('price')}")
+            st.write(f"• {item.get('item')} – {symbol(item.get('currency'))}{item.get('price')}")
     else:
         st.info("Wishlist empty")
+
+st.divider()
+
+# ==================================================
+# 🔥 HABIT STREAKS
+# ==================================================
+st.subheader("🔥 Habit Streaks")
+
+streak_rows = habit_state(store.key, data["weeks"], data_version())["stats"].summary()
+
+if streak_rows:
+    st.dataframe(streak_rows, use_container_width=True, hide_index=True)
+else:
+    st.info("No habits tracked yet")
+
+st.divider()
+
+# ==================================================
+# 🗓 YEAR IN REVIEW
+# ==================================================
+st.subheader("🗓 Year in Review")
+
+day_arrays = cached_day_arrays(data_version(), data)
+heat_years = data_years(day_arrays, today)
+heat_year = st.selectbox(
+    "Year",
+    heat_years,
+    index=heat_years.index(today.year),
+    key="heatmap_year"
+)
+
+def calendar_heatmap(origin, values, title, colorscale, hover):
+    z, week_starts = year_grid(origin, values, heat_year)
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=week_starts,
+        y=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+        colorscale=colorscale,
+        xgap=2,
+        ygap=2,
+        hoverongaps=False,
+        hovertemplate=hover
+    ))
+    fig.update_layout(title=title, height=240, yaxis_autorange="reversed", margin=dict(t=40, b=10))
+    return fig
+
+h1, h2 = st.columns(2)
+
+with h1:
+    st.plotly_chart(
+        calendar_heatmap(
+            *day_arrays["habits"], "Habit completion", "Purples",
+            "Week of %{x}, %{y}: %{z:.0%}<extra></extra>"
+        ),
+        use_container_width=True
+    )
+
+with h2:
+    st.plotly_chart(
+        calendar_heatmap(
+            *day_arrays["spend"], "Daily spend", "Reds",
+            "Week of %{x}, %{y}: ₹%{z:,.0f}<extra></extra>"
+        ),
+        use_container_width=True
+    )
+
+st.divider()
+
+# ==================================================
+# 🗄 BACKUPS
+# ==================================================
+# only read when opened, so the dashboard doesn't pay for a long history
+if st.toggle("🗄 Backups", key="show_backups"):
+    backups = store.backups
+    latest = backups.latest()
+
+    if not latest:
+        st.info("No snapshots yet — one is taken on every save")
+    else:
+        st.caption(f"{latest} snapshots · only changed weeks / months / sections are stored each time")
+        st.dataframe(
+            pd.DataFrame(backups.history(limit=50), columns=["Version", "Saved at", "Chunks changed"]),
+            use_container_width=True,
+            hide_index=True,
+            height=200
+        )
+
+        b1, b2 = st.columns(2)
+
+        with b1:
+            restore_version = st.number_input(
+                "Restore version", 1, latest, value=latest, key="restore_version"
+            )
+            if st.button("⏪ Restore", key="restore_backup"):
+                # restoring is itself saved as a new snapshot, so it can be undone
+                save_data(backups.restore(int(restore_version)))
+                st.success(f"Restored version {restore_version}")
+                st.rerun()
+
+        with b2:
+            since = st.number_input(
+                "Changes since version", 0, latest, value=0, key="delta_since"
+            )
+            st.download_button(
+                "⬇️ Export changes",
+                json.dumps(backups.changes_since(int(since)), indent=2),
+                file_name=f"planner-changes-{since}-{latest}.json",
+                mime="application/json"
+            )
@@ -0,0 +1,242 @@
+"""Concurrent-session load test for the Streamlit pages.
+
+    python loadtest.py --sessions 8 --iterations 5
+
+Every simulated session drives its own AppTest copies of the Expenses,
+Daily Tasks and Savings pages in its own process, all against one
+throw-away store, so the data file sees real contention:
+
+- Expenses: adds an expense tagged with the session / step in its note
+- Daily Tasks: flips the session's own task for today
+- Savings: saves a budget for a month only that session uses
+
+Afterwards the store is read back and every write that is missing (or
+was overwritten by an older value) is reported as a lost update, along
+with p50/p95/p99 rerun latency per page and overall write throughput.
+"""
+import argparse, json, logging, multiprocessing, os, shutil, sys, tempfile, time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+FIRST_YEAR, LAST_YEAR = 2030, 2050     # budget years nobody uses for real
+
+
+def _widget(elements, label):
+    return next(w for w in elements if w.label == label)
+
+
+class Session:
+    """One simulated user session looping through the scripted edits."""
+
+    def __init__(self, number, iterations, user):
+        self.number = number
+        self.iterations = iterations
+        self.user = user
+        self.timings = {"expenses": [], "tasks": [], "savings": []}
+        self.writes = 0
+        self.errors = []
+        self.expected_notes = []
+        self.expected_budgets = {}
+        self.expected_done = None
+        self.pages = None
+
+    def _page(self, script):
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=120)
+        at.session_state["user"] = self.user
+        return at
+
+    def _run(self, page, action, timed=True):
+        t0 = time.perf_counter()
+        at = action.run()
+        if timed:
+            self.timings[page].append(time.perf_counter() - t0)
+        self.errors.extend(f"{page}: {e.value}" for e in at.exception)
+        return at
+
+    def warm_up(self):
+        # first runs compile the scripts and import their modules; they're
+        # not rerun latency, so they stay off the percentiles and the clock
+        self.pages = (
+            self._run("expenses", self._page("pages/2_Expenses.py"), timed=False),
+            self._run("tasks", self._page("pages/1_Daily_Tasks.py"), timed=False),
+            self._run("savings", self._page("pages/3_Savings.py"), timed=False)
+        )
+
+    def run(self):
+        expenses, tasks, savings = self.pages
+
+        today = date.today().isoformat()
+        done_key = f"task_done_{today}_{self.number}"
+        for i in range(self.iterations):
+            note = f"loadtest s{self.number} i{i}"
+            _widget(expenses.number_input, "Amount (₹)").set_value(100.0 + self.number)
+            _widget(expenses.text_input, "Note / merchant (optional)").set_value(note)
+            _widget(expenses.selectbox, "Category").set_value("Food")
+            expenses = self._run("expenses", _widget(expenses.button, "Add Expense").click())
+            self.expected_notes.append(note)
+
+            box = tasks.checkbox(key=done_key)
+            self.expected_done = not box.value
+            tasks = self._run("tasks", box.set_value(self.expected_done))
+
+            year, month = divmod(self.number * self.iterations + i, 12)
+            budget = 500 * (self.number + i + 1)
+            _widget(savings.selectbox, "Month").set_value(MONTHS[month])
+            _widget(savings.number_input, "Year").set_value(FIRST_YEAR + year)
+            _widget(savings.number_input, "Monthly Budget (₹)").set_value(budget)
+            savings = self._run("savings", _widget(savings.button, "💾 Save Budget").click())
+            self.expected_budgets[(FIRST_YEAR + year, MONTHS[month])] = budget
+
+            self.writes += 3
+
+
+def _session_process(number, iterations, user, barrier, results):
+    # AppTest swaps process-wide runtime state on every run, so concurrent
+    # sessions each get a process; the data file is what they share
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    logging.disable(logging.WARNING)
+
+    session = Session(number, iterations, user)
+    try:
+        session.warm_up()
+    except Exception as e:
+        session.errors.append(f"warm-up {type(e).__name__}: {e}")
+    barrier.wait()
+    try:
+        if not session.errors:
+            session.run()
+    except Exception as e:
+        session.errors.append(f"{type(e).__name__}: {e}")
+    session.pages = None    # AppTest objects don't pickle
+    results.put(session)
+
+
+# ==================================================
+# 🔎 LOST UPDATE CHECK
+# ==================================================
+def lost_updates(sessions, data):
+    """[(session, kind, detail)] for every write not in the final data."""
+    notes = {e.get("note") for e in data.get("expenses", [])}
+    budgets = {(s.get("year"), s.get("month")): s.get("budget") for s in data.get("savings", [])}
+    today = date.today().isoformat()
+    tasks = {
+        t.get("text"): t.get("done")
+        for week in data.get("weeks", {}).values()
+        for t in week.get(today, {}).get("tasks", [])
+    }
+
+    lost = []
+    for s in sessions:
+        for note in s.expected_notes:
+            if note not in notes:
+                lost.append((s.number, "expense", note))
+        for (year, month), budget in s.expected_budgets.items():
+            if budgets.get((year, month)) != budget:
+                lost.append((s.number, "budget", f"{month} {year}: want {budget}, got {budgets.get((year, month))}"))
+        if s.expected_done is not None and tasks.get(_task_text(s.number)) != s.expected_done:
+            lost.append((s.number, "task", f"want done={s.expected_done}, got {tasks.get(_task_text(s.number))}"))
+    return lost
+
+
+def _task_text(number):
+    return f"loadtest task {number}"
+
+
+def _seed(path, n_sessions):
+    """Fresh store with one task per session on today's date."""
+    today = date.today()
+    monday = date.fromordinal(today.toordinal() - today.weekday())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "weeks": {monday.isoformat(): {today.isoformat(): {
+                "habits": [],
+                "tasks": [{"text": _task_text(n), "done": False} for n in range(n_sessions)]
+            }}},
+            "expenses": [],
+            "savings": []
+        }, f, indent=2)
+
+
+def _percentiles(values):
+    import numpy as np
+    if not values:
+        return "-"
+    p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+    return f"p50 {p50:7.0f} ms   p95 {p95:7.0f} ms   p99 {p99:7.0f} ms   (n={len(values)})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the planner pages")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="keep the test store afterwards")
+    args = parser.parse_args()
+
+    if args.sessions * args.iterations > 12 * (LAST_YEAR - FIRST_YEAR + 1):
+        parser.error("too many sessions × iterations for distinct budget months")
+
+    # the store root is read when utils.store is imported, so set it first
+    root = tempfile.mkdtemp(prefix="planner-loadtest-")
+    os.environ["PLANNER_DATA_ROOT"] = root
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from utils.store import StorePool
+    user = "loadtest"
+    store = StorePool(root=root).get(user)
+    _seed(store.path, args.sessions)
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(args.sessions + 1)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_session_process, args=(n, args.iterations, user, barrier, results))
+        for n in range(args.sessions)
+    ]
+    for p in procs:
+        p.start()
+
+    # the clock starts once every session has warmed up its pages
+    barrier.wait()
+    t0 = time.perf_counter()
+    sessions = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    sessions.sort(key=lambda s: s.number)
+
+    lost = lost_updates(sessions, store.load())
+    writes = sum(s.writes for s in sessions)
+    errors = [(s.number, e) for s in sessions for e in s.errors]
+
+    print(f"{args.sessions} sessions × {args.iterations} iterations in {elapsed:.1f}s")
+    print("\nRerun latency")
+    for page in ("expenses", "tasks", "savings"):
+        print(f"  {page:9} {_percentiles([t for s in sessions for t in s.timings[page]])}")
+    print(f"  {'all':9} {_percentiles([t for s in sessions for ts in s.timings.values() for t in ts])}")
+    print(f"\nWrite throughput: {writes / elapsed:.2f} writes/s ({writes} writes)")
+
+    print(f"\nLost updates: {len(lost)}")
+    for number, kind, detail in lost:
+        print(f"  session {number} {kind}: {detail}")
+    if errors:
+        print(f"\nErrors: {len(errors)}")
+        for number, e in errors:
+            print(f"  session {number}: {e}")
+
+    if args.keep:
+        print(f"\nStore kept at {store.path}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    return 1 if lost or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,13 @@
 import streamlit as st
+import json
 from datetime import date, timedelta
-import json, os
+from utils.fx import rates_version
+from utils.pending import pending_state
+from utils.habits import habit_state
+from utils.recurring import (
+    FREQUENCIES, WEEKDAYS, new_rule, describe, materialize_day, legacy_habit_names
+)
+from utils.store import current_store
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(page_title="Daily Tasks", page_icon="✅", layout="wide")
@@ -25,20 +32,26 @@ with open("styles/dark_purple.css") as f:
 
 
 # ---------- DATA ----------
-DATA_FILE = "data.json"
+store = current_store()
 
 def load_data():
-    if not os.path.exists(DATA_FILE):
+    if not store.exists():
         return {"weeks": {}}
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
+    return store.load()
 
 def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    store.save(data)
+
+def data_version():
+    # same shape as the other pages: the pending / habit states are shared
+    return (*store.version(), rates_version())
 
 data = load_data()
 data.setdefault("weeks", {})
+data.setdefault("recurring", [])
+
+pending = pending_state(store.key, data["weeks"], data_version())
+habit_stats = habit_state(store.key, data["weeks"], data_version())
 
 # ---------- WEEK LOGIC ----------
 if "week_offset" not in st.session_state:
@@ -82,8 +95,75 @@ with nav_right:
         st.rerun()
 
 # ---------- INIT WEEK ----------
+def week_fingerprint():
+    # empty days / lists are recreated on every view, so they don't count as edits
+    week = data["weeks"].get(week_key, {})
+    days = {k: {f: v for f, v in d.items() if v} for k, d in week.items() if isinstance(d, dict)}
+    return json.dumps({k: d for k, d in days.items() if d}, sort_keys=True)
+
+loaded_week = week_fingerprint()
 data["weeks"].setdefault(week_key, {})
 
+def save_week():
+    # every edit on this page is inside the shown week, so only its days
+    # need to be refreshed in the pending-task index and habit stats; both
+    # are shared with other sessions, so patch + save happen under their
+    # locks (always pending first)
+    with pending["lock"], habit_stats["lock"]:
+        for day_key, day in data["weeks"][week_key].items():
+            pending["index"].update_day(day_key, day)
+            habit_stats["stats"].update_day(day_key, day)
+        save_data(data)
+        pending["version"] = habit_stats["version"] = data_version()
+
+# ---------- RECURRING ----------
+with st.expander("🔁 Recurring habits & tasks"):
+    with st.form("recurring_form", clear_on_submit=True):
+        r1, r2, r3 = st.columns(3)
+
+        with r1:
+            rec_kind = st.selectbox("Type", ["habit", "task"])
+            rec_text = st.text_input("Text")
+
+        with r2:
+            rec_freq = st.selectbox("Repeats", FREQUENCIES)
+            rec_start = st.date_input("Starting", value=week_start)
+
+        with r3:
+            rec_weekdays = st.multiselect(
+                "Weekdays (weekly)", range(7), format_func=lambda i: WEEKDAYS[i]
+            )
+            rec_day = st.number_input("Day of month (monthly)", 1, 31, value=1)
+
+        if st.form_submit_button("➕ Add Recurring") and rec_text.strip():
+            data["recurring"].append(new_rule(
+                rec_kind, rec_freq, rec_start,
+                weekdays=rec_weekdays, day=rec_day, text=rec_text.strip()
+            ))
+            save_week()
+            st.rerun()
+
+    # one-off import of the habit names from the old weekly_tasks maps
+    existing = {r.get("text") for r in data["recurring"] if r["kind"] == "habit"}
+    legacy = [n for n in legacy_habit_names(data) if n not in existing]
+    if legacy and st.button(f"Import {len(legacy)} daily habit(s) from old weekly planner"):
+        for name in legacy:
+            data["recurring"].append(new_rule("habit", "daily", week_start, text=name))
+        save_week()
+        st.rerun()
+
+    for rule in data["recurring"]:
+        if rule["kind"] not in ("habit", "task"):
+            continue
+
+        r1, r2 = st.columns([6, 1])
+        r1.write(f"• {rule['kind'].title()}: {rule['text']} — {describe(rule)} from {rule['start']}")
+
+        if r2.button("🗑", key=f"del_recurring_{rule['id']}"):
+            data["recurring"].remove(rule)
+            save_week()
+            st.rerun()
+
 # ---------- MAIN GRID ----------
 st.subheader("✅ Weekly Task & Habit Tracker")
 cols = st.columns(7)
@@ -97,6 +177,9 @@ for i, col in enumerate(cols):
         "tasks": []
     })
 
+    # recurring habits / tasks only ever land in the week being viewed
+    materialize_day(data["recurring"], day_key, data["weeks"][week_key][day_key])
+
     with col:
         st.markdown(f"**{days[i]}**")
         st.caption(day_date.strftime("%d %b"))
@@ -113,7 +196,7 @@ for i, col in enumerate(cols):
                     "text": habit_text.strip(),
                     "done": False
                 })
-                save_data(data)
+                save_week()
                 st.rerun()
 
         for hi, habit in enumerate(data["weeks"][week_key][day_key]["habits"]):
@@ -136,7 +219,7 @@ for i, col in enumerate(cols):
             with h3:
                 if st.button("🗑", key=f"habit_del_{day_key}_{hi}"):
                     data["weeks"][week_key][day_key]["habits"].pop(hi)
-                    save_data(data)
+                    save_week()
                     st.rerun()
 
         st.markdown("---")
@@ -153,7 +236,7 @@ for i, col in enumerate(cols):
                     "text": task_text.strip(),
                     "done": False
                 })
-                save_data(data)
+                save_week()
                 st.rerun()
 
         for ti, task in enumerate(data["weeks"][week_key][day_key]["tasks"]):
@@ -176,7 +259,7 @@ for i, col in enumerate(cols):
             with t3:
                 if st.button("🗑", key=f"task_del_{day_key}_{ti}"):
                     data["weeks"][week_key][day_key]["tasks"].pop(ti)
-                    save_data(data)
+                    save_week()
                     st.rerun()
                     # ---------- WEEKLY PROGRESS ----------
 total_items = 0
@@ -198,6 +281,20 @@ if total_items > 0:
     st.progress(percent)
     st.caption(f"{int(percent*100)}% completed")
 
+# ---------- HABIT STREAKS ----------
+# refresh the shown week first so this run's checkbox flips are included
+with habit_stats["lock"]:
+    for day_key, day in data["weeks"][week_key].items():
+        habit_stats["stats"].update_day(day_key, day)
+    streak_rows = habit_stats["stats"].summary()
+
+if streak_rows:
+    st.markdown("### 🔥 Habit Streaks")
+    st.dataframe(streak_rows, use_container_width=True, hide_index=True)
+
 
 # ---------- SAVE ----------
-save_data(data)
+# only write when this run changed the week, so browsing doesn't bump the
+# data version every version-keyed cache depends on
+if week_fingerprint() != loaded_week:
+    save_week()
@@ -1,8 +1,19 @@
 import streamlit as st
-import json, os
+import io
+import uuid
 from datetime import date, timedelta
 import pandas as pd
 import plotly.express as px
+from utils.spend_index import spend_state
+from utils.alerts import evaluate
+from utils.timeseries import cached_timeline
+from utils.categorizer import CATEGORIES, DEFAULT_RULES, get_categorizer
+from utils.fx import BASE_CURRENCY, amount_step, currencies, rates_version, symbol, tidy_amount, to_base
+from utils.recurring import (
+    FREQUENCIES, WEEKDAYS, new_rule, describe,
+    sync_recurring_expenses, upcoming_expenses
+)
+from utils.store import current_store, ensure_ids
 
 # ---------- PAGE CONFIG ----------
 st.set_page_config(page_title="Expense Tracker", page_icon="💸", layout="wide")
@@ -41,36 +52,71 @@ st.markdown(
 )
 
 # ---------- DATA ----------
-DATA_FILE = "data.json"
+store = current_store()
 
 def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {"expenses": []}
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    if not store.exists():
+        return {
+            "expenses": [],
+            "recurring": [],
+            "category_rules": [dict(r) for r in DEFAULT_RULES]
+        }
+    data = store.load()
     data.setdefault("expenses", [])
+    data.setdefault("recurring", [])
+    data.setdefault("category_rules", [dict(r) for r in DEFAULT_RULES])
+    if ensure_ids(data["expenses"]):
+        save_data(data)
     return data
 
 def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    store.save(data)
+
+def data_version():
+    # totals are in base currency, so a rate file update counts as a change
+    return (*store.version(), rates_version())
 
 data = load_data()
 
+# prefix-sum index, patched on every write below instead of rebuilt
+spend = spend_state(store.key, data["expenses"], data_version())
+
+def save_expenses():
+    # the index is shared with other sessions: patch + save + version stamp
+    # happen under its lock (callers patching first hold it already)
+    with spend["lock"]:
+        save_data(data)
+        spend["version"] = data_version()
+
+# recurring expenses due up to today become real rows
+with spend["lock"]:
+    if sync_recurring_expenses(data, spend["index"], date.today()):
+        save_expenses()
+
 # ---------- SESSION ----------
 if "edit_expense_index" not in st.session_state:
     st.session_state.edit_expense_index = None
 
 # ---------- SAFE DATAFRAME ----------
 df = pd.DataFrame(data["expenses"])
-for col in ["amount", "category", "date"]:
+for col in ["amount", "category", "date", "note"]:
     if col not in df.columns:
         df[col] = None
 
 df["date"] = pd.to_datetime(df["date"], errors="coerce")
+# every total on this page is in ₹; rows in other currencies use the as-of rate
+df["amount"] = to_base(df["amount"], df.get("currency"), df["date"])
 
 # ---------- TABS ----------
-tab_daily, tab_weekly, tab_monthly = st.tabs(["📅 Daily", "📆 Weekly", "🗓 Monthly"])
+(
+    tab_daily, tab_weekly, tab_monthly, tab_range, tab_yoy,
+    tab_timeline, tab_recurring, tab_import
+) = st.tabs(
+    ["📅 Daily", "📆 Weekly", "🗓 Monthly", "📐 Custom Range", "📊 Year over Year",
+     "📈 Timeline", "🔁 Recurring", "📥 Import"]
+)
+
+categorizer = get_categorizer(data["category_rules"])
 
 # ==================================================
 # 📅 DAILY
@@ -78,23 +124,49 @@ tab_daily, tab_weekly, tab_monthly = st.tabs(["📅 Daily", "📆 Weekly", "🗓
 with tab_daily:
     st.subheader("📅 Daily Expenses")
 
-    selected_date = st.date_input("Select date", value=date.today())
+    if "daily_date" not in st.session_state:
+        st.session_state.daily_date = date.today()
+
+    d1, d2 = st.columns([3, 1])
+    selected_date = d1.date_input("Select date", key="daily_date")
+    # outside the form so the amount input below follows the currency
+    currency = d2.selectbox("Currency", currencies(), key="daily_currency")
 
     with st.form("daily_expense_form", clear_on_submit=True):
-        amount = st.number_input("Amount (₹)", min_value=0, step=100)
+        amount = st.number_input(
+            f"Amount ({symbol(currency).strip()})",
+            min_value=0.0,
+            step=amount_step(currency),
+            format="%.2f"
+        )
+        note = st.text_input("Note / merchant (optional)")
         category = st.selectbox(
             "Category",
-            ["Food", "Shopping", "Travel", "Bills", "Xerox", "Stationary", "Other"]
+            ["Auto-detect", "Food", "Shopping", "Travel", "Bills", "Xerox", "Stationary", "Other"]
         )
         add = st.form_submit_button("Add Expense")
 
         if add and amount > 0:
-            data["expenses"].append({
+            if category == "Auto-detect":
+                category = categorizer.classify(note, "Other")
+
+            amount = tidy_amount(amount)
+            expense = {
+                "id": uuid.uuid4().hex,
                 "amount": amount,
                 "category": category,
                 "date": selected_date.isoformat()
-            })
-            save_data(data)
+            }
+            if note.strip():
+                expense["note"] = note.strip()
+            if currency != BASE_CURRENCY:
+                expense["currency"] = currency
+
+            with spend["lock"]:
+                data["expenses"].append(expense)
+                spend["index"].add(selected_date.isoformat(), category, amount, currency)
+                evaluate(data, spend["index"], selected_date, {category})
+                save_expenses()
             st.success("Expense added")
             st.rerun()
 
@@ -115,8 +187,9 @@ with tab_daily:
         for i, row in daily_df.reset_index().iterrows():
             c1, c2, c3, c4 = st.columns([3, 3, 3, 2])
 
-            c1.write(f"₹ {row['amount']}")
-            c2.write(row["category"])
+            original = data["expenses"][row["index"]]
+            c1.write(f"{symbol(original.get('currency'))} {original['amount']}")
+            c2.write(row["category"] + (f" · {row['note']}" if isinstance(row["note"], str) else ""))
             c3.write(row["date"].strftime("%d %b %Y"))
 
             with c4:
@@ -125,8 +198,13 @@ with tab_daily:
                     st.session_state.edit_expense_index = row["index"]
                     st.rerun()
                 if e2.button("🗑", key=f"del_{i}"):
-                    data["expenses"].pop(row["index"])
-                    save_data(data)
+                    with spend["lock"]:
+                        removed = data["expenses"].pop(row["index"])
+                        spend["index"].add(
+                            removed["date"], removed["category"], -removed["amount"], removed.get("currency")
+                        )
+                        evaluate(data, spend["index"], removed["date"], {removed["category"]})
+                        save_expenses()
                     st.rerun()
 
 # ==================================================
@@ -139,18 +217,47 @@ if st.session_state.edit_expense_index is not None:
     exp = data["expenses"][st.session_state.edit_expense_index]
 
     with st.form("edit_expense_form"):
-        amount = st.number_input("Amount (₹)", min_value=0, step=100, value=int(exp["amount"]))
+        e1, e2 = st.columns([3, 1])
+        amount = e1.number_input(
+            f"Amount ({symbol(exp.get('currency')).strip()})",
+            min_value=0.0,
+            step=amount_step(exp.get("currency")),
+            value=float(exp["amount"]),
+            format="%.2f"
+        )
+        currency_options = currencies()
+        exp_currency = (exp.get("currency") or BASE_CURRENCY).upper()
+        currency = e2.selectbox(
+            "Currency",
+            currency_options,
+            index=currency_options.index(exp_currency) if exp_currency in currency_options else 0
+        )
         category = st.selectbox(
             "Category",
-            ["Food", "Shopping", "Travel", "Bills", "Xerox", "Stationary", "Other"],
-            index=["Food","Shopping","Travel","Bills","Xerox","Stationary","Other"].index(exp["category"])
+            CATEGORIES,
+            index=CATEGORIES.index(exp["category"])
+            if exp["category"] in CATEGORIES else 0
         )
+        note = st.text_input("Note / merchant (optional)", value=exp.get("note", ""))
         save = st.form_submit_button("💾 Update")
 
         if save:
-            exp["amount"] = amount
-            exp["category"] = category
-            save_data(data)
+            with spend["lock"]:
+                old_category = exp["category"]
+                spend["index"].add(exp["date"], old_category, -exp["amount"], exp.get("currency"))
+                exp["amount"] = tidy_amount(amount)
+                exp["category"] = category
+                if note.strip():
+                    exp["note"] = note.strip()
+                else:
+                    exp.pop("note", None)
+                if currency != BASE_CURRENCY:
+                    exp["currency"] = currency
+                else:
+                    exp.pop("currency", None)
+                spend["index"].add(exp["date"], category, exp["amount"], exp.get("currency"))
+                evaluate(data, spend["index"], exp["date"], {old_category, category})
+                save_expenses()
             st.session_state.edit_expense_index = None
             st.success("Expense updated")
             st.rerun()
@@ -170,7 +277,7 @@ with tab_weekly:
     if weekly_df.empty:
         st.info("No expenses this week")
     else:
-        st.metric("💰 Total Spent", f"₹{weekly_df['amount'].sum()}")
+        st.metric("💰 Total Spent", f"₹{weekly_df['amount'].sum():,.0f}")
         st.plotly_chart(
             px.bar(
                 weekly_df.groupby("category", as_index=False)["amount"].sum(),
@@ -205,10 +312,30 @@ with tab_monthly:
 
         month_df = df[(df["month"] == sel_month) & (df["year"] == sel_year)]
 
+        # recurring expenses still to come this month (not stored yet)
+        month_first = date(sel_year, ALL_MONTHS.index(sel_month) + 1, 1)
+        month_last = (month_first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        upcoming = upcoming_expenses(
+            data,
+            max(month_first, date.today() + timedelta(days=1)),
+            month_last
+        )
+        upcoming_total = to_base(
+            [u["amount"] for u in upcoming],
+            [u["currency"] for u in upcoming],
+            [u["date"] for u in upcoming]
+        ).sum()
+
+        if upcoming:
+            st.caption(
+                f"🔁 ₹{upcoming_total:,.0f} in recurring expenses still due this month "
+                f"(projected total ₹{month_df['amount'].sum() + upcoming_total:,.0f})"
+            )
+
         if month_df.empty:
             st.info("No expenses for this month")
         else:
-            st.metric("💰 Total Spent", f"₹{month_df['amount'].sum()}")
+            st.metric("💰 Total Spent", f"₹{month_df['amount'].sum():,.0f}")
             st.plotly_chart(
                 px.pie(
                     month_df.groupby("category", as_index=False)["amount"].sum(),
@@ -219,3 +346,277 @@ with tab_monthly:
                 use_container_width=True
             )
             st.dataframe(month_df[["date", "category", "amount"]], use_container_width=True)
+
+# ==================================================
+# 📐 CUSTOM RANGE
+# ==================================================
+with tab_range:
+    st.subheader("📐 Custom Range")
+
+    picked = st.date_input(
+        "Date range",
+        value=(date.today().replace(day=1), date.today()),
+        key="custom_range"
+    )
+
+    if len(picked) != 2:
+        st.info("Pick a start and an end date")
+    else:
+        range_start, range_end = picked
+        split = spend["index"].category_totals(range_start, range_end)
+
+        if not split:
+            st.info("No expenses in this range")
+        else:
+            st.metric("💰 Total Spent", f"₹{sum(split.values()):,.0f}")
+            st.plotly_chart(
+                px.bar(
+                    pd.DataFrame({"category": list(split), "amount": list(split.values())}),
+                    x="category",
+                    y="amount",
+                    text_auto=True
+                ),
+                use_container_width=True,
+                key="range_chart"
+            )
+
+# ==================================================
+# 📊 YEAR OVER YEAR
+# ==================================================
+def shift_year(d, year):
+    # 29 Feb falls back to 28 Feb in non-leap years
+    try:
+        return d.replace(year=year)
+    except ValueError:
+        return d.replace(year=year, day=28)
+
+with tab_yoy:
+    st.subheader("📊 Year over Year")
+
+    span = spend["index"].span()
+
+    picked = st.date_input(
+        "Compare this range across years",
+        value=(date.today().replace(day=1), date.today()),
+        key="yoy_range"
+    )
+
+    if span is None:
+        st.info("No expenses available")
+    elif len(picked) != 2:
+        st.info("Pick a start and an end date")
+    else:
+        yoy_start, yoy_end = picked
+        rows = []
+        for year in range(span[0].year, span[1].year + 1):
+            offset = year - yoy_start.year
+            rows.append({
+                "year": str(year),
+                "amount": spend["index"].total(
+                    shift_year(yoy_start, yoy_start.year + offset),
+                    shift_year(yoy_end, yoy_end.year + offset)
+                )
+            })
+
+        st.plotly_chart(
+            px.bar(pd.DataFrame(rows), x="year", y="amount", text_auto=True),
+            use_container_width=True,
+            key="yoy_chart"
+        )
+
+# ==================================================
+# 📈 TIMELINE
+# ==================================================
+with tab_timeline:
+    st.subheader("📈 Spending Timeline")
+
+    granularity = st.radio("Group by", ["Daily", "Weekly"], horizontal=True, key="timeline_freq")
+    timeline = cached_timeline(data_version(), granularity[0], 2000, data["expenses"])
+
+    if timeline.empty:
+        st.info("No expenses available")
+    else:
+        st.plotly_chart(
+            px.line(timeline, x="date", y="amount", labels={"amount": "Amount (₹)", "date": ""}),
+            use_container_width=True,
+            key="timeline_chart"
+        )
+
+# ==================================================
+# 🔁 RECURRING
+# ==================================================
+with tab_recurring:
+    st.subheader("🔁 Recurring Expenses")
+    st.caption("Added automatically on each due day — never ahead of today")
+
+    # outside the form so the amount input below follows the currency
+    rec_currency = st.selectbox("Currency", currencies(), key="rec_currency")
+
+    with st.form("recurring_expense_form", clear_on_submit=True):
+        r1, r2, r3 = st.columns(3)
+
+        with r1:
+            rec_amount = st.number_input(
+                f"Amount ({symbol(rec_currency).strip()})",
+                min_value=0.0,
+                step=amount_step(rec_currency),
+                format="%.2f",
+                key="rec_amount"
+            )
+            rec_category = st.selectbox(
+                "Category",
+                ["Food", "Shopping", "Travel", "Bills", "Xerox", "Stationary", "Other"],
+                key="rec_category"
+            )
+
+        with r2:
+            rec_freq = st.selectbox("Repeats", FREQUENCIES, key="rec_freq")
+            rec_start = st.date_input("Starting", value=date.today(), key="rec_start")
+
+        with r3:
+            rec_weekdays = st.multiselect(
+                "Weekdays (weekly)",
+                range(7),
+                format_func=lambda i: WEEKDAYS[i],
+                key="rec_weekdays"
+            )
+            rec_day = st.number_input("Day of month (monthly)", 1, 31, value=1, key="rec_day")
+
+        if st.form_submit_button("➕ Add Recurring") and rec_amount > 0:
+            rule = new_rule(
+                "expense", rec_freq, rec_start,
+                weekdays=rec_weekdays, day=rec_day,
+                amount=tidy_amount(rec_amount), category=rec_category
+            )
+            if rec_currency != BASE_CURRENCY:
+                rule["currency"] = rec_currency
+            with spend["lock"]:
+                data["recurring"].append(rule)
+                sync_recurring_expenses(data, spend["index"], date.today())
+                save_expenses()
+            st.rerun()
+
+    for rule in data["recurring"]:
+        if rule["kind"] != "expense":
+            continue
+
+        r1, r2 = st.columns([6, 1])
+        r1.write(f"• {symbol(rule.get('currency'))}{rule['amount']} {rule['category']} — {describe(rule)} from {rule['start']}")
+
+        if r2.button("🗑", key=f"del_recurring_{rule['id']}"):
+            data["recurring"].remove(rule)
+            save_expenses()
+            st.rerun()
+
+# ==================================================
+# 📥 IMPORT
+# ==================================================
+with tab_import:
+    st.subheader("📥 Bulk Import")
+    st.caption("CSV with columns date, amount, note and optionally category and currency. "
+               "Rows without a category are auto-categorized from the note.")
+
+    uploaded = st.file_uploader("CSV file", type="csv")
+    pasted = st.text_area("…or paste CSV", placeholder="date,amount,note\n2025-01-05,250,Swiggy dinner")
+
+    source = uploaded if uploaded is not None else (io.StringIO(pasted) if pasted.strip() else None)
+
+    if source is not None:
+        try:
+            incoming = pd.read_csv(source)
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(f"Could not read CSV: {e}")
+            incoming = None
+
+        if incoming is not None:
+            incoming.columns = [c.strip().lower() for c in incoming.columns]
+            missing = {"date", "amount"} - set(incoming.columns)
+
+            if missing:
+                st.error(f"Missing column(s): {', '.join(sorted(missing))}")
+            else:
+                if "note" not in incoming.columns:
+                    incoming["note"] = ""
+                if "category" not in incoming.columns:
+                    incoming["category"] = None
+                if "currency" not in incoming.columns:
+                    incoming["currency"] = BASE_CURRENCY
+                incoming["currency"] = incoming["currency"].fillna(BASE_CURRENCY).astype(str).str.upper()
+
+                # an all-blank category column is read as float64
+                incoming["category"] = incoming["category"].astype(object)
+                incoming["note"] = incoming["note"].fillna("").astype(str)
+                incoming["date"] = pd.to_datetime(incoming["date"], errors="coerce").dt.date
+                incoming["amount"] = pd.to_numeric(incoming["amount"], errors="coerce")
+
+                bad = (
+                    incoming["date"].isna()
+                    | incoming["amount"].isna()
+                    | (incoming["amount"] <= 0)
+                    | ~incoming["currency"].isin(currencies())
+                )
+                if bad.any():
+                    # +2: header line, 1-based line numbers
+                    lines = ", ".join(str(i + 2) for i in incoming.index[bad][:20])
+                    st.error(f"Skipping {bad.sum()} row(s) with a bad date, amount or currency (line {lines})")
+                incoming = incoming[~bad]
+
+                unknown = ~incoming["category"].isin(CATEGORIES)
+                incoming.loc[unknown, "category"] = categorizer.classify_many(incoming.loc[unknown, "note"])
+
+                st.dataframe(
+                    incoming[["date", "amount", "currency", "category", "note"]],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+                if st.button(f"📥 Import {len(incoming)} expense(s)"):
+                    with spend["lock"]:
+                        touched = set()
+                        for row in incoming.to_dict("records"):
+                            expense = {
+                                "id": uuid.uuid4().hex,
+                                "amount": tidy_amount(row["amount"]),
+                                "category": row["category"],
+                                "date": row["date"].isoformat()
+                            }
+                            if row["note"].strip():
+                                expense["note"] = row["note"].strip()
+                            if row["currency"] != BASE_CURRENCY:
+                                expense["currency"] = row["currency"]
+                            data["expenses"].append(expense)
+                            spend["index"].add(
+                                expense["date"], expense["category"], expense["amount"], row["currency"]
+                            )
+                            touched.add((expense["date"], expense["category"]))
+
+                        for day, cat in touched:
+                            evaluate(data, spend["index"], day, {cat})
+                        save_expenses()
+                    st.success(f"Imported {len(incoming)} expense(s)")
+                    st.rerun()
+
+    # ---- Rules ----
+    st.markdown("### 🔤 Auto-categorization Rules")
+    st.caption("Keywords are matched as whole words in the note; the longest match wins")
+
+    rules_df = st.data_editor(
+        pd.DataFrame(data["category_rules"], columns=["keyword", "category"]),
+        column_config={
+            "category": st.column_config.SelectboxColumn("category", options=CATEGORIES, required=True)
+        },
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key="category_rules_editor"
+    )
+
+    if st.button("💾 Save Rules"):
+        data["category_rules"] = [
+            {"keyword": str(r["keyword"]).strip().lower(), "category": r["category"]}
+            for r in rules_df.to_dict("records")
+            if isinstance(r["keyword"], str) and r["keyword"].strip() and r["category"]
+        ]
+        save_expenses()
+        st.success("Rules saved")
+        st.rerun()
@@ -1,8 +1,13 @@
 import streamlit as st
-import json, os
 import pandas as pd
 import plotly.express as px
 from datetime import date
+from utils.forecast import cached_forecast
+from utils.spend_index import spend_state
+from utils.alerts import BUDGET_RULES, RULE_TYPES, evaluate, new_rule, drop_rule
+from utils.recurring import sync_recurring_expenses
+from utils.fx import rates_version, to_base
+from utils.store import current_store
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(page_title="Savings Tracker", page_icon="💰", layout="wide")
@@ -11,15 +16,14 @@ st.set_page_config(page_title="Savings Tracker", page_icon="💰", layout="wide"
 with open("styles/dark_purple.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
-DATA_FILE = "data.json"
+store = current_store()
 
 # ---------------- LOAD / SAVE DATA ----------------
 def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {"expenses": [], "savings": []}
+    if not store.exists():
+        return {"expenses": [], "savings": [], "alert_rules": [], "alerts": {}}
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    data = store.load()
 
     # clean savings
     cleaned = []
@@ -30,14 +34,31 @@ def load_data():
 
     data["savings"] = cleaned
     data.setdefault("expenses", [])
+    data.setdefault("alert_rules", [])
+    data.setdefault("alerts", {})
     return data
 
 def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    store.save(data)
+
+def data_version():
+    # totals are in base currency, so a rate file update counts as a change
+    return (*store.version(), rates_version())
 
 data = load_data()
 
+spend = spend_state(store.key, data["expenses"], data_version())
+
+def save_savings():
+    # the index is shared with other sessions; see pages/2_Expenses.py
+    with spend["lock"]:
+        save_data(data)
+        spend["version"] = data_version()
+
+with spend["lock"]:
+    if sync_recurring_expenses(data, spend["index"], date.today()):
+        save_savings()
+
 # ---------------- SESSION STATE ----------------
 if "edit_budget" not in st.session_state:
     st.session_state.edit_budget = None
@@ -48,6 +69,7 @@ if exp_df.empty:
     exp_df = pd.DataFrame(columns=["amount", "category", "date"])
 
 exp_df["date"] = pd.to_datetime(exp_df["date"], errors="coerce")
+exp_df["amount"] = to_base(exp_df["amount"], exp_df.get("currency"), exp_df["date"])
 exp_df["month"] = exp_df["date"].dt.strftime("%B")
 exp_df["year"] = exp_df["date"].dt.year
 exp_df["week"] = exp_df["date"].dt.isocalendar().week
@@ -79,7 +101,7 @@ default_year = (
 )
 
 default_budget = (
-    st.session_state.edit_budget["budget"]
+    int(st.session_state.edit_budget["budget"])
     if st.session_state.edit_budget
     else 0
 )
@@ -109,7 +131,8 @@ if st.button("💾 Save Budget"):
     })
 
     st.session_state.edit_budget = None
-    save_data(data)
+    evaluate(data, spend["index"], date(int(sel_year), months.index(sel_month) + 1, 1), kinds=BUDGET_RULES)
+    save_savings()
     st.success("Budget saved")
     st.rerun()
 
@@ -144,7 +167,7 @@ for i, m in enumerate(months):
         savings_trend.append({"Month": m[:3], "Saved": saved})
 
         if spent > budget_val and budget_val > 0:
-            st.error(f"⚠ Overspent by ₹{spent - budget_val}")
+            st.error(f"⚠ Overspent by ₹{spent - budget_val:,.0f}")
 
         st.markdown(
             f"""
@@ -152,9 +175,9 @@ for i, m in enumerate(months):
             background:rgba(255,255,255,0.05);
             border:1px solid rgba(255,255,255,0.08);">
                 <b>{m[:3]} {str(year_filter)[-2:]}</b><br>
-                Budget: ₹{budget_val}<br>
-                Actual: ₹{spent}<br>
-                <b>Saved: ₹{saved}</b>
+                Budget: ₹{budget_val:,}<br>
+                Actual: ₹{spent:,.0f}<br>
+                <b>Saved: ₹{saved:,.0f}</b>
             </div>
             """,
             unsafe_allow_html=True
@@ -169,7 +192,8 @@ for i, m in enumerate(months):
             with c_del:
                 if st.button("🗑 Delete", key=f"del_{m}"):
                     data["savings"].remove(entry)
-                    save_data(data)
+                    evaluate(data, spend["index"], date(year_filter, i + 1, 1), kinds=BUDGET_RULES)
+                    save_savings()
                     st.rerun()
 
 # ==================================================
@@ -247,6 +271,48 @@ if entry:
 else:
     st.info("Set a budget to see comparison")
 
+# ==================================================
+# 🔮 FORECAST
+# ==================================================
+st.markdown("---")
+st.markdown("### 🔮 Forecast")
+st.caption("Recent daily average, adjusted for how you usually spend on each weekday")
+
+forecast = cached_forecast(data_version(), int(sel_year), date.today(), data["expenses"])
+sel_month_no = months.index(sel_month) + 1
+month_fc = forecast.loc[sel_month_no]
+
+f1, f2, f3 = st.columns(3)
+f1.metric("💸 Spent so far", f"₹{month_fc['actual']:,.0f}")
+f2.metric("📈 Projected month-end", f"₹{month_fc['projected']:,.0f}")
+
+if entry:
+    f3.metric("💰 Projected savings", f"₹{entry['budget'] - month_fc['projected']:,.0f}")
+else:
+    f3.metric("💰 Projected savings", "—")
+
+budget_by_month = {
+    months.index(b["month"]) + 1: b["budget"]
+    for b in data["savings"]
+    if b["year"] == sel_year and b["month"] in months
+}
+
+rest = forecast.loc[sel_month_no:].copy()
+rest["Month"] = [months[m - 1][:3] for m in rest.index]
+rest["Budget"] = [budget_by_month.get(m, 0) for m in rest.index]
+rest["Projected savings"] = rest["Budget"] - rest["projected"]
+
+st.markdown(f"**Rest of {sel_year}** — projected savings ₹{rest['Projected savings'].sum():,.0f}")
+st.plotly_chart(
+    px.bar(
+        rest.rename(columns={"projected": "Projected spend"}),
+        x="Month",
+        y=["Budget", "Projected spend"],
+        barmode="group"
+    ),
+    use_container_width=True
+)
+
 # ==================================================
 # 📈 SAVINGS TREND
 # ==================================================
@@ -264,3 +330,42 @@ st.plotly_chart(
     ),
     use_container_width=True
 )
+
+# ==================================================
+# 🚨 ALERT RULES
+# ==================================================
+st.markdown("---")
+st.markdown("### 🚨 Alert Rules")
+st.caption("Checked whenever an expense or budget is saved")
+
+expense_categories = ["Food", "Shopping", "Travel", "Bills", "Xerox", "Stationary", "Other"]
+
+with st.form("alert_rule_form", clear_on_submit=True):
+    r1, r2, r3 = st.columns(3)
+
+    with r1:
+        rule_type = st.selectbox("Rule", list(RULE_TYPES), format_func=RULE_TYPES.get)
+
+    with r2:
+        rule_category = st.selectbox("Category (category rules only)", expense_categories)
+
+    with r3:
+        threshold = st.number_input("X", min_value=0.0, value=100.0, step=5.0)
+
+    if st.form_submit_button("➕ Add Rule") and threshold > 0:
+        data["alert_rules"].append(new_rule(rule_type, threshold, rule_category))
+        evaluate(data, spend["index"], date.today())
+        save_savings()
+        st.rerun()
+
+for rule in data["alert_rules"]:
+    a1, a2 = st.columns([6, 1])
+    label = RULE_TYPES[rule["type"]].replace("X", f"{rule['threshold']:g}")
+    if rule["type"] == "category":
+        label = label.replace("Category", rule["category"])
+    a1.write(f"• {label}")
+
+    if a2.button("🗑", key=f"del_rule_{rule['id']}"):
+        drop_rule(data, rule["id"])
+        save_savings()
+        st.rerun()
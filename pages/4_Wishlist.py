@@ -1,6 +1,12 @@
 import streamlit as st
-import json, os
+import uuid
+import threading
 import pandas as pd
+from datetime import date
+from utils.search import TrigramIndex
+from utils.planner import MONTHS, cached_plan, cached_past_savings
+from utils.fx import BASE_CURRENCY, currencies, rates_version, symbol, to_base
+from utils.store import POOL_SIZE, current_store
 
 # ---------------- PAGE CONFIG ----------------
 st.set_page_config(page_title="Wishlist & Shopping List", page_icon="🛍️", layout="wide")
@@ -9,28 +15,38 @@ st.set_page_config(page_title="Wishlist & Shopping List", page_icon="🛍️", l
 with open("styles/dark_purple.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
-DATA_FILE = "data.json"
+store = current_store()
 
 # ---------------- LOAD / SAVE ----------------
 def load_data():
-    if not os.path.exists(DATA_FILE):
+    if not store.exists():
         return {"wishlist": []}
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
+    data = store.load()
 
     # 🔒 ensure wishlist is always a list of dicts
     cleaned = []
+    missing_ids = False
     for item in data.get("wishlist", []):
         if isinstance(item, dict):
+            # stable ids so the search index survives inserts / deletes
+            if "id" not in item:
+                item["id"] = uuid.uuid4().hex
+                missing_ids = True
             cleaned.append(item)
 
     data["wishlist"] = cleaned
+    if missing_ids:
+        save_data(data)
     return data
 
 def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    store.save(data)
+
+def data_version():
+    # changes on every save (or rate file update), so cached views are
+    # rebuilt only after a write
+    return (*store.version(), rates_version())
 
 data = load_data()
 
@@ -38,6 +54,29 @@ data = load_data()
 if "edit_index" not in st.session_state:
     st.session_state.edit_index = None
 
+if "wishlist_page" not in st.session_state:
+    st.session_state.wishlist_page = 1
+
+# ---------------- SEARCH INDEX ----------------
+def search_text(entry):
+    return f"{entry.get('item', '')} {entry.get('brand', '')} {entry.get('specs', '')}"
+
+@st.cache_resource(max_entries=POOL_SIZE)
+def wishlist_search_state(store_key):
+    # shared across reruns and sessions; rebuilt only if the file changed
+    # behind our back. Rebuilds and patch + save happen under the lock
+    return {"version": None, "index": TrigramIndex(), "lock": threading.Lock()}
+
+search_state = wishlist_search_state(store.key)
+
+with search_state["lock"]:
+    if search_state["version"] != data_version():
+        index = TrigramIndex()
+        for entry in data["wishlist"]:
+            index.add(entry["id"], search_text(entry))
+        search_state["index"] = index
+        search_state["version"] = data_version()
+
 # ---------------- HEADER ----------------
 st.markdown("## 🛍️ Wishlist & Shopping List")
 st.caption("Plan your purchases — not impulse buys")
@@ -55,6 +94,36 @@ CATEGORIES = [
 
 PRIORITIES = ["Need", "Want", "Nice to Have"]
 
+SORT_OPTIONS = {
+    "Price": "price_base",
+    "Priority": "priority_rank",
+    "Category": "category"
+}
+
+PAGE_SIZE = 12
+
+# ---------------- CACHED FILTER ----------------
+@st.cache_data(show_spinner=False, max_entries=POOL_SIZE * 8)
+def filter_wishlist(version, cat_filter, pr_filter, sort_by, descending, _items):
+    # _items is not hashed; version + the filter selection is the cache key
+    df = pd.DataFrame(_items)
+    df["index"] = range(len(df))
+    # prices in other currencies are compared at today's rate
+    df["price_base"] = to_base(df["price"], df.get("currency"), [None] * len(df))
+
+    if cat_filter:
+        df = df[df["category"].isin(cat_filter)]
+
+    if pr_filter:
+        df = df[df["priority"].isin(pr_filter)]
+
+    df["priority_rank"] = df["priority"].map(
+        {p: i for i, p in enumerate(PRIORITIES)}
+    ).fillna(len(PRIORITIES))
+
+    df = df.sort_values(SORT_OPTIONS[sort_by], ascending=not descending, kind="stable")
+    return df.drop(columns=["priority_rank"]).reset_index(drop=True)
+
 # ==================================================
 # ➕ ADD / EDIT ITEM
 # ==================================================
@@ -81,12 +150,20 @@ with st.form("wishlist_form", clear_on_submit=False):
         brand = st.text_input("Brand", value=current["brand"])
 
     with c2:
-        price = st.number_input(
-            "Price (₹)",
+        p1, p2 = st.columns([3, 1])
+        price = p1.number_input(
+            "Price",
             min_value=0.0,
             step=10.0,
             value=float(current["price"])
         )
+        currency_options = currencies()
+        currency = p2.selectbox(
+            "Currency",
+            currency_options,
+            index=currency_options.index(current.get("currency", BASE_CURRENCY))
+            if current.get("currency", BASE_CURRENCY) in currency_options else 0
+        )
         specs = st.text_input("Specs", value=current["specs"])
 
     with c3:
@@ -118,14 +195,21 @@ with st.form("wishlist_form", clear_on_submit=False):
             "category": category,
             "url": url
         }
+        if currency != BASE_CURRENCY:
+            entry["currency"] = currency
 
         if edit_mode:
+            entry["id"] = current.get("id", uuid.uuid4().hex)
             data["wishlist"][st.session_state.edit_index] = entry
             st.session_state.edit_index = None
         else:
+            entry["id"] = uuid.uuid4().hex
             data["wishlist"].append(entry)
 
-        save_data(data)
+        with search_state["lock"]:
+            search_state["index"].add(entry["id"], search_text(entry))
+            save_data(data)
+            search_state["version"] = data_version()
         st.success("Item saved successfully")
         st.rerun()
 
@@ -139,25 +223,68 @@ if not data["wishlist"]:
     st.info("Your wishlist is empty")
     st.stop()
 
-df = pd.DataFrame(data["wishlist"])
+all_df = pd.DataFrame(data["wishlist"])
+
+# ---- Search ----
+query = st.text_input(
+    "🔎 Search items, brands and specs",
+    placeholder="e.g. wireles headphnes",
+    key="wishlist_query"
+)
 
-# ---- Filters ----
-f1, f2 = st.columns(2)
+# ---- Filters / sorting ----
+f1, f2, f3, f4 = st.columns([3, 3, 2, 1])
 
 with f1:
-    cat_filter = st.multiselect("Filter by category", sorted(df["category"].unique()))
+    cat_filter = st.multiselect("Filter by category", sorted(all_df["category"].unique()))
 
 with f2:
-    pr_filter = st.multiselect("Filter by priority", sorted(df["priority"].unique()))
+    pr_filter = st.multiselect("Filter by priority", sorted(all_df["priority"].unique()))
+
+with f3:
+    sort_by = st.selectbox("Sort by", list(SORT_OPTIONS))
+
+with f4:
+    descending = st.checkbox("Desc", value=False)
+
+df = filter_wishlist(
+    data_version(),
+    tuple(cat_filter),
+    tuple(pr_filter),
+    sort_by,
+    descending,
+    data["wishlist"]
+)
+
+if query.strip():
+    with search_state["lock"]:
+        hits = search_state["index"].search(query, limit=500)
+    rank = {doc_id: r for r, (doc_id, _) in enumerate(hits)}
+    df = df[df["id"].isin(rank)]
+    df = df.iloc[df["id"].map(rank).argsort()]
+
+if df.empty:
+    st.info("No items match these filters")
+    st.stop()
+
+# ---- Pagination ----
+n_pages = max(1, -(-len(df) // PAGE_SIZE))
+
+if st.session_state.wishlist_page > n_pages:
+    st.session_state.wishlist_page = n_pages
+
+p1, p2 = st.columns([1, 5])
+
+with p1:
+    page = st.number_input("Page", min_value=1, max_value=n_pages, key="wishlist_page")
 
-if cat_filter:
-    df = df[df["category"].isin(cat_filter)]
+with p2:
+    st.caption(f"Page {page} of {n_pages} • {len(df)} items")
 
-if pr_filter:
-    df = df[df["priority"].isin(pr_filter)]
+page_df = df.iloc[(page - 1) * PAGE_SIZE: page * PAGE_SIZE]
 
 # ---- Display table ----
-st.dataframe(df, use_container_width=True, hide_index=True)
+st.dataframe(page_df.drop(columns=["index", "id", "price_base"]), use_container_width=True, hide_index=True)
 
 # ==================================================
 # ✏️ EDIT / DELETE CONTROLS
@@ -166,7 +293,7 @@ st.markdown("### ✏️ Manage Items")
 
 cols = st.columns(4)
 
-for i, row in df.reset_index().iterrows():
+for i, row in enumerate(page_df.to_dict("records")):
     real_index = row["index"]
 
     with cols[i % 4]:
@@ -179,7 +306,7 @@ for i, row in df.reset_index().iterrows():
                 border:1px solid rgba(255,255,255,0.08);
             ">
                 <b>{row['item']}</b><br>
-                ₹ {row['price']}<br>
+                {symbol(row.get('currency') if isinstance(row.get('currency'), str) else None)} {row['price']}<br>
                 🏷 {row['priority']}<br>
                 📂 {row['category']}
             </div>
@@ -196,12 +323,59 @@ for i, row in df.reset_index().iterrows():
 
         with c2:
             if st.button("🗑 Delete", key=f"del_{real_index}"):
-                data["wishlist"].pop(real_index)
-                save_data(data)
+                removed = data["wishlist"].pop(real_index)
+                with search_state["lock"]:
+                    search_state["index"].remove(removed["id"])
+                    save_data(data)
+                    search_state["version"] = data_version()
                 st.rerun()
 
 # ==================================================
 # 💰 TOTAL COST
 # ==================================================
 st.markdown("---")
-st.metric("💰 Total Wishlist Cost", f"₹{df['price'].sum():,.2f}")
+st.metric("💰 Total Wishlist Cost", f"₹{df['price_base'].sum():,.2f}")
+
+# ==================================================
+# 🗓 AFFORDABILITY PLANNER
+# ==================================================
+st.markdown("---")
+st.markdown("### 🗓 Affordability Planner")
+st.caption("Monthly budget minus projected spend, spent on items by priority then price")
+
+today = date.today()
+already_saved = cached_past_savings(data_version(), today, data)
+
+a1, a2 = st.columns(2)
+
+with a1:
+    opening = st.number_input(
+        "Already saved (₹)",
+        min_value=0.0,
+        step=500.0,
+        value=float(max(already_saved, 0))
+    )
+
+with a2:
+    horizon = st.slider("Plan ahead (months)", 6, 60, 24)
+
+months_plan, plan = cached_plan(data_version(), opening, horizon, today, data)
+
+if not any(budget for _, _, budget, _ in months_plan):
+    st.info("Set a monthly budget on the Savings page to plan purchases")
+else:
+    plan_df = pd.DataFrame([
+        {
+            "Item": p.get("item"),
+            "Priority": p.get("priority"),
+            "Price (₹)": p.get("price"),
+            "Buy in": f"{MONTHS[p['buy'][1] - 1][:3]} {p['buy'][0]}" if p["buy"] else "Beyond horizon"
+        }
+        for p in plan
+    ])
+    st.dataframe(plan_df, use_container_width=True, hide_index=True)
+
+    needs = [p for p in plan if p.get("priority") == "Need"]
+    if needs and all(p["buy"] for p in needs):
+        y, m = max(p["buy"] for p in needs)
+        st.success(f"✅ All Need items affordable by {MONTHS[m - 1]} {y}")
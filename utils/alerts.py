@@ -0,0 +1,115 @@
+import uuid
+from datetime import date, timedelta
+
+RULE_TYPES = {
+    "budget": "Monthly spend reaches X% of budget",
+    "category": "Category spend reaches X% of budget",
+    "spike": "Daily spend over X × 30-day average"
+}
+
+SPIKE_LOOKBACK = 30
+# rules measured against the monthly budget; a budget write only affects these
+BUDGET_RULES = ("budget", "category")
+
+
+def new_rule(kind, threshold, category=None):
+    return {
+        "id": uuid.uuid4().hex[:8],
+        "type": kind,
+        "threshold": threshold,
+        "category": category if kind == "category" else None
+    }
+
+
+def month_bounds(d):
+    start = d.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def monthly_budget(data, d):
+    name = d.strftime("%B")
+    return next(
+        (
+            s.get("budget", 0) for s in data.get("savings", [])
+            if s.get("month") == name and s.get("year") == d.year
+        ),
+        0
+    )
+
+
+def _check(rule, data, index, d):
+    """(alert key, alert or None) for one rule around day d."""
+    threshold = float(rule["threshold"])
+
+    if rule["type"] == "spike":
+        key = f"{rule['id']}|{d.isoformat()}"
+        day_total = index.total(d, d)
+        average = index.total(d - timedelta(days=SPIKE_LOOKBACK), d - timedelta(days=1)) / SPIKE_LOOKBACK
+        if average > 0 and day_total > threshold * average:
+            return key, {
+                "date": d.isoformat(),
+                "message": f"Spent ₹{day_total:,.0f} on {d:%d %b}, "
+                           f"{day_total / average:.1f}× your daily average"
+            }
+        return key, None
+
+    start, end = month_bounds(d)
+    key = f"{rule['id']}|{start:%Y-%m}"
+    budget = monthly_budget(data, d)
+    if not budget:
+        return key, None
+
+    if rule["type"] == "budget":
+        spent = index.total(start, end)
+        label = "Spending"
+    else:
+        spent = index.category_totals(start, end).get(rule["category"], 0)
+        label = rule["category"]
+
+    if spent >= budget * threshold / 100:
+        return key, {
+            "date": start.isoformat(),
+            "message": f"{label} in {start:%B %Y} is ₹{spent:,.0f}, "
+                       f"{spent / budget:.0%} of the ₹{budget} budget"
+        }
+    return key, None
+
+
+# ==================================================
+# 🚨 INCREMENTAL EVALUATION
+# ==================================================
+def evaluate(data, index, day, categories=None, kinds=None):
+    """Re-check the rules affected by a write on `day` and update data["alerts"].
+
+    Only the month (and for spikes, the day) containing `day` is looked at,
+    and category rules are skipped unless their category is in
+    `categories` (None means all). `kinds` limits the rule types checked;
+    budget writes pass BUDGET_RULES. Totals come from the prefix-sum index.
+    """
+    if isinstance(day, str):
+        try:
+            day = date.fromisoformat(day[:10])
+        except ValueError:
+            return
+
+    alerts = data.setdefault("alerts", {})
+
+    for rule in data.get("alert_rules", []):
+        if kinds is not None and rule["type"] not in kinds:
+            continue
+        if rule["type"] == "category" and categories is not None and rule["category"] not in categories:
+            continue
+
+        key, alert = _check(rule, data, index, day)
+        if alert:
+            alerts[key] = dict(alert, rule_id=rule["id"])
+        else:
+            alerts.pop(key, None)
+
+
+def drop_rule(data, rule_id):
+    data["alert_rules"] = [r for r in data.get("alert_rules", []) if r["id"] != rule_id]
+    data["alerts"] = {
+        k: a for k, a in data.get("alerts", {}).items() if a.get("rule_id") != rule_id
+    }
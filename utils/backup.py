@@ -0,0 +1,314 @@
+import hashlib, json, os, threading
+from bisect import bisect_right
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:     # Windows: the in-process lock is all we get
+    fcntl = None
+
+# Chunk keys: "weeks/<monday>", "expenses/<YYYY-MM>", and one chunk per
+# other top-level section ("savings", "wishlist", "recurring", ...).
+# LAYOUT records the order everything came in, so join() is exact.
+UNDATED = "undated"
+LAYOUT = "_layout"
+
+
+def backup_dir(data_file):
+    """data.json -> data.backups/ next to it (same idea as the search index)."""
+    stem, _ = os.path.splitext(data_file)
+    return stem + ".backups"
+
+
+def _encode(value):
+    # key order is kept (not sorted) so a restore round-trips byte for byte
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _digest(blob):
+    return hashlib.sha256(blob).hexdigest()
+
+
+# ==================================================
+# ✂️ CHUNKING
+# ==================================================
+def split(data):
+    """{chunk key: value} for one copy of the data.
+
+    Weeks and expense months are separate chunks, so a click that touches
+    one day or one expense only changes one chunk (plus the small layout).
+    The layout keeps the key order and the expense order as runs of
+    [month chunk, count].
+    """
+    chunks = {}
+    layout = {"keys": list(data), "weeks": None, "expenses": None}
+
+    for key, value in data.items():
+        if key == "weeks" and isinstance(value, dict):
+            layout["weeks"] = list(value)
+            for week_key, week in value.items():
+                chunks[f"weeks/{week_key}"] = week
+        elif key == "expenses" and isinstance(value, list):
+            runs = layout["expenses"] = []
+            for e in value:
+                month = str(e.get("date", ""))[:7] if isinstance(e, dict) else ""
+                chunk = f"expenses/{month or UNDATED}"
+                chunks.setdefault(chunk, []).append(e)
+                if runs and runs[-1][0] == chunk:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([chunk, 1])
+        else:
+            chunks[key] = value
+
+    chunks[LAYOUT] = layout
+    return chunks
+
+
+def join(chunks):
+    """Inverse of split(): the same keys, weeks and expenses in the same order."""
+    layout = chunks.get(LAYOUT) or _sorted_layout(chunks)
+    data = {}
+    for key in layout["keys"]:
+        if key == "weeks" and layout["weeks"] is not None:
+            data[key] = {w: chunks[f"weeks/{w}"] for w in layout["weeks"]}
+        elif key == "expenses" and layout["expenses"] is not None:
+            taken = {}
+            data[key] = []
+            for chunk, n in layout["expenses"]:
+                i = taken.get(chunk, 0)
+                data[key].extend(chunks[chunk][i:i + n])
+                taken[chunk] = i + n
+        else:
+            data[key] = chunks[key]
+    return data
+
+
+def _sorted_layout(chunks):
+    # snapshots taken before the layout chunk existed: sorted order
+    keys, weeks, runs = [], [], []
+    for key in sorted(chunks):
+        section, _, part = key.partition("/")
+        if part and section == "weeks":
+            weeks.append(part)
+        elif part and section == "expenses":
+            runs.append([key, len(chunks[key])])
+        if section not in keys:
+            keys.append(section)
+    return {"keys": keys, "weeks": weeks, "expenses": runs}
+
+
+# ==================================================
+# 🗄 SNAPSHOT STORE
+# ==================================================
+class Backups:
+    """Content-addressed snapshots of one data file.
+
+    Chunks live in objects/<hash[:2]>/<hash>.json and are written once.
+    snapshots.jsonl has one line per snapshot: most lines hold only the
+    chunk keys that changed or went away since the previous version, and
+    every CHECKPOINT versions a line holds the full chunk map, so the
+    manifest grows with what changed and an old version is rebuilt from at
+    most CHECKPOINT lines. Versions count up from 1.
+
+    Only the latest chunk map is kept in memory, plus the encoded chunks of
+    this process's last snapshot so unchanged chunks aren't hashed again.
+    Appends happen under an flock on the manifest, so the UI and the API can
+    both snapshot the same store without handing out a version twice.
+    """
+
+    CHECKPOINT = 64
+
+    def __init__(self, data_file):
+        self.root = backup_dir(data_file)
+        self.manifest = os.path.join(self.root, "snapshots.jsonl")
+        self.lock = threading.Lock()
+        self._offset = 0        # manifest bytes read so far
+        self._lines = {}        # version -> (offset, time, chunks changed)
+        self._checkpoints = []  # versions whose line has the full chunk map
+        self._latest = {}       # chunk map of the newest snapshot
+        self._version = 0
+        self._hashed = {}       # chunk key -> (blob, digest) last snapshotted here
+
+    # ---------- MANIFEST ----------
+    def _refresh(self):
+        # append-only, so only lines written since the last look (possibly
+        # by another process) are read
+        if not os.path.exists(self.manifest) or os.path.getsize(self.manifest) <= self._offset:
+            return
+        # one copy per refresh, not per line; readers may hold the old map
+        latest = dict(self._latest)
+        with open(self.manifest, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset = self._offset
+                self._offset += len(line)
+                if not line.strip():
+                    continue
+                snap = json.loads(line)
+                before = latest
+                latest = _apply(latest, snap)
+                if "chunks" in snap:
+                    self._checkpoints.append(snap["version"])
+                changed = snap.get("changed")
+                if changed is None:
+                    # manifests from before the count was stored (full maps)
+                    changed = _changed(before, latest)
+                self._lines[snap["version"]] = (offset, snap["time"], changed)
+                self._version = snap["version"]
+        self._latest = latest
+
+    def latest(self):
+        self._refresh()
+        return self._version
+
+    def _chunks(self, version):
+        self._refresh()
+        if version == self._version and version:
+            return self._latest
+        if version not in self._lines:
+            raise KeyError(f"no snapshot {version}")
+        # nearest full map at or before `version`, then its deltas
+        start = self._checkpoints[bisect_right(self._checkpoints, version) - 1]
+        chunks = {}
+        with open(self.manifest, "rb") as f:
+            f.seek(self._lines[start][0])
+            for line in f:
+                if not line.strip():
+                    continue
+                snap = json.loads(line)
+                chunks = _apply(chunks, snap)
+                if snap["version"] == version:
+                    return chunks
+
+    # ---------- OBJECTS ----------
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest + ".json")
+
+    def _write_object(self, digest, blob):
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        return True
+
+    def _read_object(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(f.read())
+
+    # ---------- WRITE ----------
+    def _hash(self, data):
+        # a chunk whose bytes match the last snapshot keeps its digest, so a
+        # click only pays SHA-256 for the chunks it touched
+        hashed = {}
+        for key, value in split(data).items():
+            blob = _encode(value)
+            seen = self._hashed.get(key)
+            hashed[key] = seen if seen and seen[0] == blob else (blob, _digest(blob))
+        self._hashed = hashed
+        return {key: digest for key, (_, digest) in hashed.items()}
+
+    def snapshot(self, data):
+        """Record `data` if it differs from the latest snapshot.
+
+        Returns the new version, or None when nothing changed.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with self.lock, open(self.manifest, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                chunk_map = self._hash(data)
+                # another process may have appended while we waited
+                self._refresh()
+                changed = {k: d for k, d in chunk_map.items() if self._latest.get(k) != d}
+                removed = sorted(k for k in self._latest if k not in chunk_map)
+                if self._version and not changed and not removed:
+                    return None
+
+                for key, digest in changed.items():
+                    self._write_object(digest, self._hashed[key][0])
+
+                version = self._version + 1
+                entry = {
+                    "version": version,
+                    "time": datetime.now().isoformat(timespec="seconds"),
+                    "changed": len(changed) + len(removed)
+                }
+                if not self._checkpoints or version - self._checkpoints[-1] >= self.CHECKPOINT:
+                    entry["chunks"] = chunk_map
+                else:
+                    entry["delta"] = changed
+                    entry["removed"] = removed
+                f.write((json.dumps(entry) + "\n").encode("utf-8"))
+                f.flush()
+                self._refresh()
+                return version
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ---------- READ ----------
+    def history(self, limit=None):
+        """[(version, time, chunks changed)], newest first."""
+        self._refresh()
+        versions = sorted(self._lines, reverse=True)[:limit]
+        return [(v, *self._lines[v][1:]) for v in versions]
+
+    def restore(self, version):
+        """The data exactly as it was at `version`."""
+        chunks = self._chunks(version)
+        return join({key: self._read_object(digest) for key, digest in chunks.items()})
+
+    def changes_since(self, version):
+        """Delta from `version` (0 = nothing) to the latest snapshot.
+
+        Only chunks whose hash differs are included, so the export grows
+        with what changed rather than with the size of the history.
+        """
+        old = self._chunks(version) if version else {}
+        latest = self.latest()
+        new = self._chunks(latest) if latest else {}
+        return {
+            "from": version,
+            "to": latest,
+            "changed": {
+                key: self._read_object(digest)
+                for key, digest in new.items() if old.get(key) != digest
+            },
+            "removed": sorted(key for key in old if key not in new)
+        }
+
+
+def _apply(chunks, snap):
+    """Chunk map after one manifest line: its full map, or `chunks` (updated
+    in place) with its delta."""
+    if "chunks" in snap:
+        return dict(snap["chunks"])
+    for key in snap.get("removed", []):
+        chunks.pop(key, None)
+    chunks.update(snap.get("delta", {}))
+    return chunks
+
+
+def _changed(before, after):
+    """How many chunks differ between two chunk maps."""
+    return (
+        sum(1 for k, d in after.items() if before.get(k) != d)
+        + sum(1 for k in before if k not in after)
+    )
+
+
+def apply_changes(data, delta):
+    """Bring a copy of the data at delta["from"] up to delta["to"]."""
+    chunks = split(data)
+    for key in delta["removed"]:
+        chunks.pop(key, None)
+    chunks.update(delta["changed"])
+    return join(chunks)
@@ -0,0 +1,120 @@
+from collections import deque
+
+import streamlit as st
+
+from utils.store import POOL_SIZE
+
+CATEGORIES = ["Food", "Shopping", "Travel", "Bills", "Xerox", "Stationary", "Other"]
+
+DEFAULT_RULES = [
+    {"keyword": "swiggy", "category": "Food"},
+    {"keyword": "zomato", "category": "Food"},
+    {"keyword": "restaurant", "category": "Food"},
+    {"keyword": "cafe", "category": "Food"},
+    {"keyword": "grocery", "category": "Food"},
+    {"keyword": "amazon", "category": "Shopping"},
+    {"keyword": "flipkart", "category": "Shopping"},
+    {"keyword": "myntra", "category": "Shopping"},
+    {"keyword": "uber", "category": "Travel"},
+    {"keyword": "ola", "category": "Travel"},
+    {"keyword": "metro", "category": "Travel"},
+    {"keyword": "petrol", "category": "Travel"},
+    {"keyword": "irctc", "category": "Travel"},
+    {"keyword": "electricity", "category": "Bills"},
+    {"keyword": "recharge", "category": "Bills"},
+    {"keyword": "rent", "category": "Bills"},
+    {"keyword": "wifi", "category": "Bills"},
+    {"keyword": "xerox", "category": "Xerox"},
+    {"keyword": "print", "category": "Xerox"},
+    {"keyword": "notebook", "category": "Stationary"},
+    {"keyword": "pen", "category": "Stationary"}
+]
+
+
+# ==================================================
+# 🔤 AHO-CORASICK TRIE
+# ==================================================
+class KeywordMatcher:
+    """Aho-Corasick automaton: one pass over a text finds every keyword."""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]   # keywords ending at each state
+
+        for kw in keywords:
+            state = 0
+            for ch in kw:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.out[state].append(kw)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """[(end index, keyword)] for every occurrence in text."""
+        state = 0
+        found = []
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            found.extend((i, kw) for kw in self.out[state])
+        return found
+
+
+class Categorizer:
+    """Maps free text (note / merchant) to a category via keyword rules.
+
+    When several keywords match, the longest one wins, so a specific rule
+    like "amazon pay bill" beats a generic "amazon".
+    """
+
+    def __init__(self, rules):
+        self.by_keyword = {}
+        for r in rules:
+            kw = str(r.get("keyword", "")).strip().lower()
+            if kw and r.get("category"):
+                self.by_keyword[kw] = r["category"]
+        self.matcher = KeywordMatcher(self.by_keyword)
+
+    def classify(self, text, default=None):
+        text = str(text or "").lower()
+        best = None
+        for end, kw in self.matcher.find(text):
+            # whole words only, so "pen" doesn't fire inside "expense"
+            start = end - len(kw) + 1
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end + 1 < len(text) and text[end + 1].isalnum():
+                continue
+            if best is None or len(kw) > len(best):
+                best = kw
+        return self.by_keyword[best] if best else default
+
+    def classify_many(self, texts, default="Other"):
+        return [self.classify(t, default) for t in texts]
+
+
+@st.cache_resource(max_entries=POOL_SIZE)
+def _cached_categorizer(rules_key):
+    return Categorizer([{"keyword": k, "category": c} for k, c in rules_key])
+
+
+def get_categorizer(rules):
+    """Build (or reuse) the automaton for this exact rule set."""
+    key = tuple((r.get("keyword", ""), r.get("category", "")) for r in rules)
+    return _cached_categorizer(key)
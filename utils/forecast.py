@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.fx import to_base
+from utils.store import POOL_SIZE
+
+AVG_WINDOW = 28       # days behind the daily run-rate
+SEASON_WINDOW = 90    # days used for the weekday pattern
+
+
+def daily_spend(expenses):
+    """Total spend per calendar day, zero-filled between first and last day."""
+    df = pd.DataFrame(expenses)
+    if df.empty or "date" not in df.columns or "amount" not in df.columns:
+        return pd.Series(dtype=float)
+
+    dates = pd.to_datetime(df["date"], errors="coerce").dt.normalize()
+    amounts = pd.Series(to_base(df["amount"], df.get("currency"), df["date"]), index=df.index)
+
+    daily = amounts.groupby(dates).sum()
+    if daily.empty:
+        return pd.Series(dtype=float)
+    return daily.asfreq("D", fill_value=0.0)
+
+
+def fit(daily, as_of):
+    """Daily run-rate plus a multiplier per weekday (Mon=0) as of a day."""
+    if daily.empty:
+        return 0.0, np.ones(7)
+
+    hist = daily[daily.index <= as_of]
+    if hist.empty:
+        return 0.0, np.ones(7)
+
+    hist = hist.reindex(pd.date_range(hist.index[0], as_of), fill_value=0.0)
+    base = float(hist.iloc[-AVG_WINDOW:].mean())
+
+    recent = hist.iloc[-SEASON_WINDOW:]
+    overall = recent.mean()
+    if overall <= 0:
+        return base, np.ones(7)
+
+    by_weekday = recent.groupby(recent.index.weekday).mean().reindex(range(7))
+    return base, (by_weekday / overall).fillna(1.0).to_numpy()
+
+
+def forecast_year(daily, year, as_of):
+    """Per-month actual spend up to `as_of` and projected month-end totals.
+
+    Indexed by month number 1-12 with columns actual, forecast, projected.
+    """
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31")
+    future = days > as_of
+
+    base, factors = fit(daily, as_of)
+    expected = np.where(future, base * factors[days.weekday], 0.0)
+    actual = np.where(future, 0.0, daily.reindex(days, fill_value=0.0).to_numpy())
+
+    out = pd.DataFrame({"actual": actual, "forecast": expected}, index=days)
+    monthly = out.groupby(days.month).sum()
+    monthly["projected"] = monthly["actual"] + monthly["forecast"]
+    return monthly
+
+
+# a few years per user, for every pooled user
+@st.cache_data(show_spinner=False, max_entries=POOL_SIZE * 4)
+def cached_forecast(version, year, as_of, _expenses):
+    # _expenses is not hashed; the data version stands in for it
+    return forecast_year(daily_spend(_expenses), year, pd.Timestamp(as_of))
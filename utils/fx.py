@@ -0,0 +1,125 @@
+import os
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+# Every total in the app is reported in the base currency. fx_rates.csv
+# holds "base units per 1 unit of currency" as of a date; append rows to it
+# to update rates offline.
+BASE_CURRENCY = "INR"
+FX_FILE = "fx_rates.csv"
+
+SYMBOLS = {"INR": "₹", "USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "AED": "AED "}
+
+_cache = {"mtime": None, "rates": None, "series": {}}
+
+
+def load_rates(path=FX_FILE):
+    """Rate table sorted by date, re-read only when the file changes."""
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    if _cache["mtime"] == mtime:
+        return _cache["rates"]
+
+    if mtime:
+        rates = pd.read_csv(path)
+        rates["date"] = pd.to_datetime(rates["date"], errors="coerce").astype("datetime64[ns]")
+        rates["currency"] = rates["currency"].astype(str).str.upper()
+        rates = rates.dropna().sort_values("date", kind="stable").reset_index(drop=True)
+    else:
+        rates = pd.DataFrame({
+            "date": pd.Series(dtype="datetime64[ns]"),
+            "currency": pd.Series(dtype=str),
+            "rate": pd.Series(dtype=float)
+        })
+
+    _cache.update(mtime=mtime, rates=rates, series={
+        cur: (g["date"].to_numpy(), g["rate"].to_numpy())
+        for cur, g in rates.groupby("currency")
+    })
+    return rates
+
+
+def rates_version():
+    """mtime of the rate file; cached totals add it to the data version so
+    an offline rate update rebuilds them like a write would."""
+    load_rates()
+    return _cache["mtime"]
+
+
+def currencies():
+    return [BASE_CURRENCY] + sorted(c for c in load_rates()["currency"].unique() if c != BASE_CURRENCY)
+
+
+def symbol(currency):
+    currency = (currency or BASE_CURRENCY).upper()
+    return SYMBOLS.get(currency, currency + " ")
+
+
+def amount_step(currency):
+    """Spinner step for amount inputs: ₹ / ¥ move in hundreds, others in units."""
+    return 100.0 if (currency or BASE_CURRENCY).upper() in ("INR", "JPY") else 1.0
+
+
+def tidy_amount(amount):
+    """Whole amounts stay ints in the data file; others keep two decimals."""
+    amount = float(amount)
+    return int(amount) if amount.is_integer() else round(amount, 2)
+
+
+# ==================================================
+# 💱 CONVERSION
+# ==================================================
+def to_base(amounts, currencies_, dates):
+    """Vectorized conversion of amounts to the base currency.
+
+    Each row uses the latest rate on or before its date (an as-of join);
+    rows dated before the first known rate use the earliest one. Missing
+    currency means base; unknown currencies are left unconverted.
+    """
+    amounts = pd.to_numeric(pd.Series(amounts, dtype=object), errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    if currencies_ is None:
+        return amounts
+
+    cur = pd.Series(currencies_, dtype=object).fillna(BASE_CURRENCY).astype(str).str.upper().to_numpy()
+
+    foreign = cur != BASE_CURRENCY
+    if not foreign.any():
+        return amounts
+
+    rates = load_rates()
+    when = pd.to_datetime(pd.Series(dates, dtype=object)[foreign], errors="coerce")
+    left = pd.DataFrame({
+        "pos": np.flatnonzero(foreign),
+        "date": when.fillna(pd.Timestamp.today().normalize()).astype("datetime64[ns]").to_numpy(),
+        "currency": cur[foreign]
+    }).sort_values("date", kind="stable")
+
+    joined = pd.merge_asof(left, rates, on="date", by="currency", direction="backward")
+    if joined["rate"].isna().any():
+        ahead = pd.merge_asof(left, rates, on="date", by="currency", direction="forward")
+        joined["rate"] = joined["rate"].fillna(ahead["rate"])
+
+    out = amounts.copy()
+    out[joined["pos"].to_numpy()] *= joined["rate"].fillna(1.0).to_numpy()
+    return out
+
+
+def convert(amount, currency, day):
+    """Scalar version of to_base() for single writes."""
+    currency = (currency or BASE_CURRENCY).upper()
+    if currency == BASE_CURRENCY:
+        return float(amount)
+
+    load_rates()
+    series = _cache["series"].get(currency)
+    if series is None:
+        return float(amount)
+
+    when = pd.to_datetime(str(day)[:10], errors="coerce")
+    if pd.isna(when):
+        when = pd.Timestamp.today().normalize()
+
+    dates, rates = series
+    i = bisect_right(dates, np.datetime64(when, "ns")) - 1
+    return float(amount) * float(rates[max(i, 0)])
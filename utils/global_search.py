@@ -0,0 +1,179 @@
+import json, os, threading
+
+from utils.search import InvertedIndex
+
+
+def index_path(data_file):
+    return os.path.splitext(data_file)[0] + ".search.json"
+
+
+def journal_path(data_file):
+    return os.path.splitext(data_file)[0] + ".search.log"
+
+
+# ---------- DOCUMENTS ----------
+def extract_docs(data):
+    """Flatten the planner into {doc_id: {"kind", "text", "date", ...}}."""
+    docs = {}
+
+    for week_key, week in data.get("weeks", {}).items():
+        for day_key, day in week.items():
+            if not isinstance(day, dict):
+                continue
+            for kind in ("habits", "tasks"):
+                for i, t in enumerate(day.get(kind, [])):
+                    if not isinstance(t, dict):
+                        continue
+                    docs[f"{kind}|{day_key}|{i}"] = {
+                        "kind": kind[:-1],
+                        "text": t.get("text", ""),
+                        "date": day_key,
+                        "week": week_key,
+                        "done": bool(t.get("done"))
+                    }
+
+    for i, e in enumerate(data.get("expenses", [])):
+        docs[f"expense|{e.get('id', i)}"] = {
+            "kind": "expense",
+            "text": f"{e.get('category', '')} {e.get('amount', '')} {e.get('note', '')}",
+            "date": e.get("date", ""),
+            "amount": e.get("amount"),
+            "currency": e.get("currency"),
+            "category": e.get("category")
+        }
+
+    for i, w in enumerate(data.get("wishlist", [])):
+        docs[f"wish|{w.get('id', i)}"] = {
+            "kind": "wish",
+            "text": f"{w.get('item', '')} {w.get('brand', '')} "
+                    f"{w.get('specs', '')} {w.get('category', '')}",
+            "date": "",
+            "item": w.get("item")
+        }
+
+    return docs
+
+
+# ==================================================
+# 🌐 GLOBAL SEARCH
+# ==================================================
+class GlobalSearch:
+    """Inverted index over tasks, habits, expenses and wishlist.
+
+    Persisted next to the data file as a base snapshot plus an append-only
+    journal: sync() is a no-op while the data version is unchanged, and
+    otherwise re-indexes and appends only the documents whose content
+    differs. The journal is folded into the base once it grows past
+    COMPACT_RATIO of the document count. Postings are rebuilt from the
+    per-document tokens on load rather than stored.
+    """
+
+    COMPACT_RATIO = 0.5
+    MIN_JOURNAL = 64
+
+    def __init__(self, data_file):
+        self.path = index_path(data_file)
+        self.journal = journal_path(data_file)
+        self.version = None
+        self.docs = {}
+        self.index = InvertedIndex()
+        self.journal_entries = 0
+        # one instance serves every session of the data file
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+
+        self._set_version(stored.get("version"))
+        self.docs = stored.get("docs", {})
+        for doc_id, toks in stored.get("tokens", {}).items():
+            self._put_tokens(doc_id, toks)
+
+        if not os.path.exists(self.journal):
+            return
+        with open(self.journal, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break   # torn last line from a crash; the rest is intact
+                for doc_id in entry.get("del", []):
+                    self.index.remove(doc_id)
+                    self.docs.pop(doc_id, None)
+                for doc_id, (doc, toks) in entry.get("put", {}).items():
+                    self._put_tokens(doc_id, toks)
+                    self.docs[doc_id] = doc
+                self._set_version(entry.get("version"))
+                self.journal_entries += 1
+
+    def _set_version(self, version):
+        # JSON turns the version tuple into a list
+        self.version = tuple(version) if isinstance(version, list) else version
+
+    def _put_tokens(self, doc_id, toks):
+        self.index.remove(doc_id)
+        self.index.docs[doc_id] = set(toks)
+        for t in toks:
+            self.index.postings.setdefault(t, set()).add(doc_id)
+
+    def _compact(self):
+        stored = {
+            "version": self.version,
+            "docs": self.docs,
+            "tokens": {d: sorted(toks) for d, toks in self.index.docs.items()}
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(stored, f)
+        os.replace(tmp, self.path)
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+        self.journal_entries = 0
+
+    def _append(self, put, deleted):
+        entry = {"version": self.version, "put": put, "del": deleted}
+        with open(self.journal, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.journal_entries += 1
+
+    def sync(self, data, version):
+        with self.lock:
+            return self._sync(data, version)
+
+    def _sync(self, data, version):
+        if version == self.version:
+            return 0
+
+        fresh = extract_docs(data)
+        deleted = [doc_id for doc_id in self.docs if doc_id not in fresh]
+        for doc_id in deleted:
+            self.index.remove(doc_id)
+            del self.docs[doc_id]
+
+        put = {}
+        for doc_id, doc in fresh.items():
+            if self.docs.get(doc_id) != doc:
+                self.index.add(doc_id, doc["text"])
+                self.docs[doc_id] = doc
+                put[doc_id] = (doc, sorted(self.index.docs[doc_id]))
+
+        self.version = version
+        limit = max(self.MIN_JOURNAL, self.COMPACT_RATIO * len(self.docs))
+        if not os.path.exists(self.path) or self.journal_entries + 1 > limit:
+            self._compact()
+        else:
+            self._append(put, deleted)
+        return len(put) + len(deleted)
+
+    def search(self, query, limit=20):
+        """Matching docs, most recent first."""
+        with self.lock:
+            ids = self.index.search(query)
+            hits = [dict(self.docs[d], id=d) for d in ids if d in self.docs]
+        hits.sort(key=lambda h: h.get("date") or "", reverse=True)
+        return hits[:limit]
@@ -0,0 +1,171 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import date
+
+import streamlit as st
+
+from utils.store import POOL_SIZE
+
+WINDOWS = (7, 30, 90)
+
+
+class _Habit:
+    """Scheduled / done days for one habit text, as date ordinals."""
+
+    def __init__(self):
+        self.scheduled = []      # sorted
+        self.done = []           # sorted
+        self.done_set = set()
+        self.start_to_end = {}   # completed runs of consecutive days
+        self.end_to_start = {}
+        self.run_lengths = Counter()
+
+    def add_done(self, d):
+        self.done_set.add(d)
+        insort(self.done, d)
+
+        start = end = d
+        if d - 1 in self.done_set:
+            start = self.end_to_start.pop(d - 1)
+            self._drop_length(d - start)
+        if d + 1 in self.done_set:
+            end = self.start_to_end.pop(d + 1)
+            self._drop_length(end - d)
+
+        self.start_to_end[start] = end
+        self.end_to_start[end] = start
+        self.run_lengths[end - start + 1] += 1
+
+    def remove_done(self, d):
+        start = d
+        while start - 1 in self.done_set:
+            start -= 1
+        end = self.start_to_end.pop(start)
+        del self.end_to_start[end]
+        self._drop_length(end - start + 1)
+
+        self.done_set.discard(d)
+        del self.done[bisect_left(self.done, d)]
+
+        for s, e in ((start, d - 1), (d + 1, end)):
+            if s <= e:
+                self.start_to_end[s] = e
+                self.end_to_start[e] = s
+                self.run_lengths[e - s + 1] += 1
+
+    def _drop_length(self, length):
+        self.run_lengths[length] -= 1
+        if self.run_lengths[length] <= 0:
+            del self.run_lengths[length]
+
+    def current_streak(self, today):
+        # today not ticked yet doesn't break a streak that ran until yesterday
+        d = today if today in self.done_set else today - 1
+        streak = 0
+        while d in self.done_set:
+            streak += 1
+            d -= 1
+        return streak
+
+    def longest_streak(self):
+        return max(self.run_lengths, default=0)
+
+    def rate(self, today, window):
+        lo = today - window + 1
+        scheduled = bisect_right(self.scheduled, today) - bisect_left(self.scheduled, lo)
+        if scheduled == 0:
+            return None
+        done = bisect_right(self.done, today) - bisect_left(self.done, lo)
+        return done / scheduled
+
+
+# ==================================================
+# 🔥 HABIT STATS
+# ==================================================
+class HabitStats:
+    """Streaks and rolling completion rates per habit text.
+
+    update_day() diffs one day against what was recorded for it, so a
+    checkbox flip costs a couple of bisects instead of a history scan.
+    """
+
+    def __init__(self):
+        self.days = {}     # day_key -> {habit text: done}
+        self.habits = {}   # habit text -> _Habit
+
+    @classmethod
+    def from_weeks(cls, weeks):
+        stats = cls()
+        for week in weeks.values():
+            for day_key, day in week.items():
+                if isinstance(day, dict):
+                    stats.update_day(day_key, day)
+        return stats
+
+    def update_day(self, day_key, day):
+        new = {}
+        for h in day.get("habits", []):
+            if isinstance(h, dict) and h.get("text", "").strip():
+                text = h["text"].strip()
+                new[text] = new.get(text, False) or bool(h.get("done"))
+
+        old = self.days.get(day_key, {})
+        if new == old:
+            return
+
+        d = date.fromisoformat(day_key).toordinal()
+
+        for text, was_done in old.items():
+            if text not in new:
+                habit = self.habits[text]
+                if was_done:
+                    habit.remove_done(d)
+                del habit.scheduled[bisect_left(habit.scheduled, d)]
+                if not habit.scheduled:
+                    del self.habits[text]
+
+        for text, done in new.items():
+            habit = self.habits.setdefault(text, _Habit())
+            if text not in old:
+                insort(habit.scheduled, d)
+            if done and not old.get(text, False):
+                habit.add_done(d)
+            elif not done and old.get(text, False):
+                habit.remove_done(d)
+
+        if new:
+            self.days[day_key] = new
+        else:
+            self.days.pop(day_key, None)
+
+    def summary(self, today=None):
+        """One row per habit: streaks plus 7/30/90-day completion rates."""
+        today = (today or date.today()).toordinal()
+        rows = []
+        for text, habit in sorted(self.habits.items()):
+            row = {
+                "Habit": text,
+                "Current streak": habit.current_streak(today),
+                "Longest streak": habit.longest_streak()
+            }
+            for w in WINDOWS:
+                rate = habit.rate(today, w)
+                row[f"{w}d %"] = None if rate is None else round(rate * 100)
+            rows.append(row)
+        return rows
+
+
+@st.cache_resource(max_entries=POOL_SIZE)
+def _shared_state(store_key):
+    return {"version": None, "stats": HabitStats(), "lock": threading.RLock()}
+
+
+def habit_state(store_key, weeks, version):
+    """Shared stats, rebuilt only when the data file changed elsewhere."""
+    state = _shared_state(store_key)
+    with state["lock"]:
+        if state["version"] != version:
+            state["stats"] = HabitStats.from_weeks(weeks)
+            state["version"] = version
+    return state
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+import numpy as np
+import streamlit as st
+
+from utils.forecast import daily_spend
+from utils.store import POOL_SIZE
+
+
+def _to_array(ordinals, values):
+    """Scatter (ordinal, value) pairs into a float32 day array; NaN = no data."""
+    if not ordinals:
+        return None, np.zeros(0, dtype=np.float32)
+
+    ordinals = np.asarray(ordinals)
+    origin = int(ordinals.min())
+    out = np.full(int(ordinals.max()) - origin + 1, np.nan, dtype=np.float32)
+    out[ordinals - origin] = values
+    return origin, out
+
+
+def habit_days(weeks):
+    """Share of habits ticked per day."""
+    ordinals, ratios = [], []
+    for week in weeks.values():
+        for day_key, day in week.items():
+            if not isinstance(day, dict):
+                continue
+            habits = [h for h in day.get("habits", []) if isinstance(h, dict)]
+            if not habits:
+                continue
+            try:
+                ordinals.append(date.fromisoformat(day_key).toordinal())
+            except ValueError:
+                continue
+            ratios.append(sum(bool(h.get("done")) for h in habits) / len(habits))
+    return _to_array(ordinals, ratios)
+
+
+def spend_days(expenses):
+    series = daily_spend(expenses)
+    if series.empty:
+        return None, np.zeros(0, dtype=np.float32)
+    origin = series.index[0].date().toordinal()
+    return origin, series.to_numpy(dtype=np.float32)
+
+
+@st.cache_data(show_spinner=False, max_entries=POOL_SIZE * 2)
+def cached_day_arrays(version, _data):
+    # one pass over the history per data version; years are sliced from this
+    return {
+        "habits": habit_days(_data.get("weeks", {})),
+        "spend": spend_days(_data.get("expenses", []))
+    }
+
+
+def data_years(arrays, today):
+    """Years covered by any of the day arrays, newest first; always has today's."""
+    first = last = today.year
+    for origin, values in arrays.values():
+        if origin is not None and len(values):
+            first = min(first, date.fromordinal(origin).year)
+            last = max(last, date.fromordinal(origin + len(values) - 1).year)
+    return list(range(last, first - 1, -1))
+
+
+def year_grid(origin, values, year):
+    """7 x n_weeks matrix (rows Mon-Sun) for a GitHub-style calendar.
+
+    Returns (z, week_starts); cells outside the year or without data are NaN.
+    """
+    jan1 = date(year, 1, 1)
+    start = jan1 - timedelta(days=jan1.weekday())
+    n_weeks = ((date(year, 12, 31) - start).days // 7) + 1
+
+    days = np.arange(start.toordinal(), start.toordinal() + 7 * n_weeks)
+    z = np.full(days.shape, np.nan, dtype=np.float32)
+
+    if origin is not None:
+        pos = days - origin
+        ok = (pos >= 0) & (pos < len(values))
+        ok &= (days >= jan1.toordinal()) & (days <= date(year, 12, 31).toordinal())
+        z[ok] = values[pos[ok]]
+
+    week_starts = [start + timedelta(weeks=w) for w in range(n_weeks)]
+    return z.reshape(n_weeks, 7).T, week_starts
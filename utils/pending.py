@@ -0,0 +1,79 @@
+import threading
+from bisect import bisect_left, insort
+
+import streamlit as st
+
+from utils.store import POOL_SIZE
+
+
+# ==================================================
+# 📝 PENDING TASK INDEX
+# ==================================================
+class PendingIndex:
+    """Open tasks kept sorted by due day.
+
+    Entries are (day_key, position, text). Day keys are ISO dates, so plain
+    string order is date order. A day is always replaced as a whole, which
+    keeps positions right after deletes.
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def from_weeks(cls, weeks):
+        index = cls()
+        for week in weeks.values():
+            for day_key, day in week.items():
+                if isinstance(day, dict):
+                    index.entries.extend(cls._open_tasks(day_key, day))
+        index.entries.sort()
+        return index
+
+    @staticmethod
+    def _open_tasks(day_key, day):
+        return [
+            (day_key, i, t.get("text", ""))
+            for i, t in enumerate(day.get("tasks", []))
+            if isinstance(t, dict) and not t.get("done")
+        ]
+
+    def update_day(self, day_key, day):
+        lo = bisect_left(self.entries, (day_key,))
+        hi = lo
+        while hi < len(self.entries) and self.entries[hi][0] == day_key:
+            hi += 1
+        del self.entries[lo:hi]
+
+        for entry in self._open_tasks(day_key, day):
+            insort(self.entries, entry)
+
+    def upcoming(self, today_key, k=5):
+        start = bisect_left(self.entries, (today_key,))
+        return self.entries[start:start + k]
+
+    def overdue_count(self, today_key):
+        return bisect_left(self.entries, (today_key,))
+
+
+@st.cache_resource(max_entries=POOL_SIZE)
+def _shared_state(store_key):
+    return {"version": None, "index": PendingIndex(), "lock": threading.RLock()}
+
+
+def pending_state(store_key, weeks, version):
+    """Shared index, rebuilt only when the data file changed elsewhere.
+
+    Pages that write tasks should call index.update_day() for the days they
+    touched and then store the new version on the returned state, holding
+    state["lock"] throughout.
+    """
+    state = _shared_state(store_key)
+    with state["lock"]:
+        if state["version"] != version:
+            state["index"] = PendingIndex.from_weeks(weeks)
+            state["version"] = version
+    return state
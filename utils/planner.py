@@ -0,0 +1,128 @@
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from utils.forecast import daily_spend, forecast_year
+from utils.fx import to_base
+from utils.store import POOL_SIZE
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+PRIORITY_RANK = {"Need": 0, "Want": 1, "Nice to Have": 2}
+
+
+def _budgets(data):
+    """{(year, month_no): budget} from the Savings page entries."""
+    out = {}
+    for s in data.get("savings", []):
+        if s.get("month") in MONTHS:
+            out[(int(s["year"]), MONTHS.index(s["month"]) + 1)] = float(s.get("budget") or 0)
+    return out
+
+
+def past_savings(data, today):
+    """Budget minus actual, summed over budgeted months before this one."""
+    budgets = _budgets(data)
+    daily = daily_spend(data.get("expenses", []))
+    spent = {}
+    if not daily.empty:
+        by_month = daily.groupby([daily.index.year, daily.index.month]).sum()
+        spent = {(int(y), int(m)): float(v) for (y, m), v in by_month.items()}
+
+    return sum(
+        budget - spent.get(key, 0.0)
+        for key, budget in budgets.items()
+        if key < (today.year, today.month)
+    )
+
+
+def projected_savings(data, today, n_months):
+    """[(year, month, budget, projected spend)] from this month onwards.
+
+    Months without a budget reuse the latest budget set before them.
+    """
+    budgets = _budgets(data)
+    daily = daily_spend(data.get("expenses", []))
+    as_of = pd.Timestamp(today)
+    forecasts = {}
+
+    rows = []
+    y, m = today.year, today.month
+    for _ in range(n_months):
+        if y not in forecasts:
+            forecasts[y] = forecast_year(daily, y, as_of)["projected"]
+
+        earlier = [k for k in budgets if k <= (y, m)]
+        budget = budgets[max(earlier)] if earlier else 0.0
+        rows.append((y, m, budget, float(forecasts[y].loc[m])))
+
+        m += 1
+        if m > 12:
+            y, m = y + 1, 1
+    return rows
+
+
+# ==================================================
+# 🗓 PURCHASE SCHEDULE
+# ==================================================
+def schedule(items, months, opening):
+    """Greedy plan: buy items in (priority, price) order as savings allow.
+
+    `months` is the projected_savings() output. Items are taken strictly in
+    order, so a Need is never pushed back by a cheaper Want; cumulative cost
+    and cumulative savings are swept together in one O(items + months) pass.
+    Items still unaffordable at the horizon get month None.
+    """
+    queue = sorted(
+        items,
+        key=lambda it: (PRIORITY_RANK.get(it.get("priority"), len(PRIORITY_RANK)), float(it.get("price") or 0))
+    )
+
+    plan = []
+    balance = opening
+    mi = 0
+    current = None
+
+    for it in queue:
+        price = float(it.get("price") or 0)
+
+        while balance < price and mi < len(months):
+            y, m, budget, spend = months[mi]
+            balance += budget - spend
+            current = (y, m)
+            mi += 1
+
+        if balance < price:
+            plan.append(dict(it, buy=None))
+            continue
+
+        if current is None:
+            current = (months[0][0], months[0][1]) if months else None
+        balance -= price
+        plan.append(dict(it, buy=current, balance_after=balance))
+
+    return plan
+
+
+@st.cache_data(show_spinner=False, max_entries=POOL_SIZE * 4)
+def cached_plan(version, opening, n_months, today, _data):
+    # _data is not hashed; the data version covers budgets, expenses and wishlist
+    months = projected_savings(_data, today, n_months)
+
+    # plan in ₹ at today's rate
+    items = _data.get("wishlist", [])
+    prices = to_base(
+        [it.get("price") for it in items],
+        [it.get("currency") for it in items],
+        [today] * len(items)
+    )
+    items = [dict(it, price=float(p)) for it, p in zip(items, prices)]
+    return months, schedule(items, months, opening)
+
+
+@st.cache_data(show_spinner=False, max_entries=POOL_SIZE * 2)
+def cached_past_savings(version, today, _data):
+    return past_savings(_data, today)
@@ -0,0 +1,152 @@
+import uuid
+from calendar import monthrange
+from datetime import date, timedelta
+
+from utils.alerts import evaluate
+
+FREQUENCIES = ["daily", "weekly", "monthly"]
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def new_rule(kind, freq, start, weekdays=None, day=1, **payload):
+    """kind is expense / habit / task; payload is amount+category or text."""
+    return dict(
+        payload,
+        id=uuid.uuid4().hex[:8],
+        kind=kind,
+        freq=freq,
+        weekdays=sorted(weekdays or []),
+        day=int(day),
+        start=start.isoformat()
+    )
+
+
+def describe(rule):
+    if rule["freq"] == "daily":
+        return "every day"
+    if rule["freq"] == "weekly":
+        return "every " + ", ".join(WEEKDAYS[i] for i in rule["weekdays"])
+    return f"monthly on day {rule['day']}"
+
+
+def occurs(rule, d):
+    if d < date.fromisoformat(rule["start"]):
+        return False
+    if rule["freq"] == "daily":
+        return True
+    if rule["freq"] == "weekly":
+        return d.weekday() in rule["weekdays"]
+    # day 31 means "last day" in shorter months
+    return d.day == min(rule["day"], monthrange(d.year, d.month)[1])
+
+
+def occurrences(rule, start, end):
+    d = max(start, date.fromisoformat(rule["start"]))
+    out = []
+    while d <= end:
+        if occurs(rule, d):
+            out.append(d)
+        d += timedelta(days=1)
+    return out
+
+
+# ==================================================
+# ✅ HABITS / TASKS — materialized per viewed day
+# ==================================================
+def materialize_day(rules, day_key, day):
+    """Add this day's recurring habits / tasks once. Returns True if changed.
+
+    Ids already placed are remembered on the day, so an instance the user
+    deleted is not brought back on the next rerun.
+    """
+    d = date.fromisoformat(day_key)
+    placed = day.setdefault("recurring", [])
+    changed = False
+
+    for rule in rules:
+        if rule["kind"] not in ("habit", "task") or rule["id"] in placed:
+            continue
+        if not occurs(rule, d):
+            continue
+
+        day.setdefault(rule["kind"] + "s", []).append({
+            "text": rule["text"],
+            "done": False,
+            "recurring_id": rule["id"]
+        })
+        placed.append(rule["id"])
+        changed = True
+
+    return changed
+
+
+# ==================================================
+# 💸 EXPENSES — caught up to today, never ahead
+# ==================================================
+def catch_up_expenses(data, today):
+    """Append recurring expenses due since each rule was last caught up.
+
+    Only days up to `today` are written; rules remember how far they got,
+    so this is O(rules) on most reruns. Returns the new expense rows.
+    """
+    new = []
+
+    for rule in data.get("recurring", []):
+        if rule["kind"] != "expense":
+            continue
+
+        start = date.fromisoformat(rule["start"])
+        if rule.get("through"):
+            start = max(start, date.fromisoformat(rule["through"]) + timedelta(days=1))
+
+        for d in occurrences(rule, start, today):
+            expense = {
+                "id": uuid.uuid4().hex,
+                "amount": rule["amount"],
+                "category": rule["category"],
+                "date": d.isoformat(),
+                "recurring_id": rule["id"]
+            }
+            if rule.get("currency"):
+                expense["currency"] = rule["currency"]
+            new.append(expense)
+        rule["through"] = today.isoformat()
+
+    data.setdefault("expenses", []).extend(new)
+    return new
+
+
+def upcoming_expenses(data, start, end):
+    """Recurring expenses that will fall in [start, end]; not stored."""
+    rows = []
+    for rule in data.get("recurring", []):
+        if rule["kind"] != "expense":
+            continue
+        for d in occurrences(rule, start, end):
+            rows.append({
+                "amount": rule["amount"],
+                "category": rule["category"],
+                "currency": rule.get("currency"),
+                "date": d.isoformat()
+            })
+    return rows
+
+
+def sync_recurring_expenses(data, index, today):
+    """Catch up recurring expenses and feed them to the spend index / alerts."""
+    new = catch_up_expenses(data, today)
+    for e in new:
+        index.add(e["date"], e["category"], e["amount"], e.get("currency"))
+        evaluate(data, index, e["date"], {e["category"]})
+    return new
+
+
+def legacy_habit_names(data):
+    """Habit names from the old weekly_tasks {name: done} maps."""
+    names = []
+    for week in data.get("weekly_tasks", {}).values():
+        if isinstance(week, dict) and isinstance(week.get("habits"), dict):
+            for name in week["habits"]:
+                if name.strip() and name not in names:
+                    names.append(name)
+    return names
@@ -0,0 +1,148 @@
+import heapq
+import re
+from collections import Counter
+
+# ---------- TEXT HELPERS ----------
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    return _NON_WORD.sub(" ", str(text or "").lower()).strip()
+
+
+def trigrams(text):
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+# ==================================================
+# 🔎 TRIGRAM INDEX
+# ==================================================
+class TrigramIndex:
+    """In-memory trigram index for typo-tolerant lookups.
+
+    Documents are added / removed one at a time so the index can be kept
+    in sync with individual saves instead of being rebuilt.
+    """
+
+    def __init__(self, min_score=0.3):
+        self.min_score = min_score
+        self.postings = {}   # trigram -> set of doc ids
+        self.docs = {}       # doc id -> set of trigrams
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, text):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+
+        grams = trigrams(text)
+        self.docs[doc_id] = grams
+        for g in grams:
+            self.postings.setdefault(g, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        grams = self.docs.pop(doc_id, None)
+        if not grams:
+            return
+
+        for g in grams:
+            ids = self.postings.get(g)
+            if ids is None:
+                continue
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[g]
+
+    def search(self, query, limit=50):
+        """Return [(doc_id, score)] best first.
+
+        score is the share of the query's trigrams found in the document,
+        so misspellings and partial words still match.
+        """
+        q_grams = trigrams(query)
+        if not q_grams:
+            return []
+
+        hits = Counter()
+        for g in q_grams:
+            hits.update(self.postings.get(g, ()))
+
+        n_query = len(q_grams)
+        ranked = []
+        for doc_id, shared in hits.items():
+            score = shared / n_query
+            if score < self.min_score:
+                continue
+            # tie-break towards shorter, tighter matches
+            jaccard = shared / (n_query + len(self.docs[doc_id]) - shared)
+            ranked.append((score, jaccard, doc_id))
+
+        best = heapq.nlargest(limit, ranked, key=lambda r: (r[0], r[1]))
+        return [(doc_id, round(score, 3)) for score, _, doc_id in best]
+
+
+def tokens(text):
+    return set(normalize(text).split())
+
+
+# ==================================================
+# 📇 INVERTED INDEX
+# ==================================================
+class InvertedIndex:
+    """Word -> doc id postings with per-document add / remove."""
+
+    def __init__(self):
+        self.postings = {}   # token -> set of doc ids
+        self.docs = {}       # doc id -> set of tokens
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id, text):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+
+        toks = tokens(text)
+        self.docs[doc_id] = toks
+        for t in toks:
+            self.postings.setdefault(t, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        toks = self.docs.pop(doc_id, None)
+        if not toks:
+            return
+
+        for t in toks:
+            ids = self.postings.get(t)
+            if ids is None:
+                continue
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[t]
+
+    def search(self, query):
+        """Doc ids containing every query word (the last word may be a prefix)."""
+        words = normalize(query).split()
+        if not words:
+            return set()
+
+        *full, last = words
+        result = None
+        for w in full:
+            ids = self.postings.get(w, set())
+            result = set(ids) if result is None else result & ids
+            if not result:
+                return set()
+
+        prefixed = set()
+        for t, ids in self.postings.items():
+            if t.startswith(last):
+                prefixed |= ids
+
+        return prefixed if result is None else result & prefixed
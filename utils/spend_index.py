@@ -0,0 +1,133 @@
+import threading
+from datetime import date
+
+import numpy as np
+import streamlit as st
+
+from utils.fx import convert, to_base
+from utils.store import POOL_SIZE
+
+
+def _ordinal(value):
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+# ==================================================
+# 📐 PREFIX-SUM SPEND INDEX
+# ==================================================
+class SpendIndex:
+    """Cumulative daily spend, overall and per category.
+
+    cum[c, i] is everything spent in category c from `origin` up to and
+    including day origin + i, so any [start, end] total is two lookups.
+    Writes add a delta to the tail of the arrays.
+    """
+
+    def __init__(self):
+        self.origin = None           # date ordinal of column 0
+        self.categories = []
+        self.cum = np.zeros((0, 0))
+
+    @classmethod
+    def from_expenses(cls, expenses):
+        index = cls()
+        rows = []
+        for e in expenses:
+            d = _ordinal(e.get("date"))
+            if d is not None:
+                rows.append((d, e.get("category") or "Other", e.get("amount"), e.get("currency"), e.get("date")))
+        if not rows:
+            return index
+
+        days, cats, raw, currencies, dates = zip(*rows)
+        amounts = to_base(raw, currencies, dates)
+        days = np.array(days)
+        index.origin = int(days.min())
+        index.categories = sorted(set(cats))
+        cat_pos = {c: i for i, c in enumerate(index.categories)}
+
+        n_days = int(days.max()) - index.origin + 1
+        flat = np.array([cat_pos[c] for c in cats]) * n_days + (days - index.origin)
+        daily = np.bincount(
+            flat,
+            weights=amounts,
+            minlength=len(index.categories) * n_days
+        ).reshape(len(index.categories), n_days)
+
+        index.cum = daily.cumsum(axis=1)
+        return index
+
+    # ---------- WRITES ----------
+    def add(self, day, category, amount, currency=None):
+        """Record `amount` (negative to undo) spent on ISO date `day`."""
+        d = _ordinal(day)
+        if d is None or not amount:
+            return
+        category = category or "Other"
+        amount = convert(amount, currency, day)
+
+        if self.origin is None:
+            self.origin = d
+            self.cum = np.zeros((0, 1))
+
+        if d < self.origin:
+            pad = np.zeros((self.cum.shape[0], self.origin - d))
+            self.cum = np.hstack([pad, self.cum])
+            self.origin = d
+
+        last = self.origin + self.cum.shape[1] - 1
+        if d > last:
+            tail = np.repeat(self.cum[:, -1:], d - last, axis=1)
+            self.cum = np.hstack([self.cum, tail])
+
+        if category not in self.categories:
+            self.categories.append(category)
+            self.cum = np.vstack([self.cum, np.zeros((1, self.cum.shape[1]))])
+
+        self.cum[self.categories.index(category), d - self.origin:] += float(amount)
+
+    # ---------- QUERIES ----------
+    def _upto(self, d):
+        """Per-category totals up to and including ordinal d."""
+        if self.origin is None or d < self.origin:
+            return np.zeros(len(self.categories))
+        i = min(d - self.origin, self.cum.shape[1] - 1)
+        return self.cum[:, i]
+
+    def category_totals(self, start, end):
+        """{category: spent} for the inclusive date range."""
+        lo, hi = start.toordinal(), end.toordinal()
+        if hi < lo:
+            return {}
+        split = self._upto(hi) - self._upto(lo - 1)
+        return {c: float(v) for c, v in zip(self.categories, split) if v}
+
+    def total(self, start, end):
+        return sum(self.category_totals(start, end).values())
+
+    def span(self):
+        if self.origin is None:
+            return None
+        return date.fromordinal(self.origin), date.fromordinal(self.origin + self.cum.shape[1] - 1)
+
+
+@st.cache_resource(max_entries=POOL_SIZE)
+def _shared_state(store_key):
+    return {"version": None, "index": SpendIndex(), "lock": threading.RLock()}
+
+
+def spend_state(store_key, expenses, version):
+    """Shared index, rebuilt only when the data file changed elsewhere.
+
+    Every session of a store shares it, so pages hold state["lock"] from
+    their index.add() calls through the save that stores the new version.
+    """
+    state = _shared_state(store_key)
+    with state["lock"]:
+        if state["version"] != version:
+            state["index"] = SpendIndex.from_expenses(expenses)
+            state["version"] = version
+    return state
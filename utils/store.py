@@ -0,0 +1,158 @@
+import json, os, re, threading, uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows: the in-process lock is all we get
+    fcntl = None
+
+import streamlit as st
+
+from utils.backup import Backups
+
+# Signed-in users get <DATA_ROOT>/<user>/data.json; no user keeps the
+# original single-file data.json so existing installs behave as before.
+DATA_ROOT = os.environ.get("PLANNER_DATA_ROOT", "users")
+DEFAULT_FILE = "data.json"
+POOL_SIZE = int(os.environ.get("PLANNER_STORE_POOL", "64"))
+# every save also records an incremental snapshot; set to 0 to turn off
+BACKUPS = os.environ.get("PLANNER_BACKUPS", "1") != "0"
+
+
+def user_key(raw):
+    return re.sub(r"[^a-z0-9_-]", "", str(raw or "").strip().lower())[:64]
+
+
+def ensure_ids(items):
+    """Give every dict in `items` a stable id. True if any were missing."""
+    missing = False
+    for item in items:
+        if isinstance(item, dict) and "id" not in item:
+            item["id"] = uuid.uuid4().hex
+            missing = True
+    return missing
+
+
+class Store:
+    """One user's data file.
+
+    Each store has its own lock, so a slow write for one user never blocks
+    another. Writes go to a temp file first and are swapped in atomically.
+    locked() holds a store across load -> save, against other threads and,
+    through a lock file, other processes that also use locked().
+    """
+
+    def __init__(self, key, path):
+        self.key = key
+        self.path = path
+        self.lock = threading.RLock()
+        self.backups = Backups(path)
+        self._depth = 0
+
+    @contextmanager
+    def locked(self):
+        with self.lock:
+            # flock is per open file, so only the outermost holder takes it
+            self._depth += 1
+            try:
+                if self._depth > 1 or fcntl is None:
+                    yield
+                    return
+                folder = os.path.dirname(self.path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                with open(self.path + ".lock", "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            finally:
+                self._depth -= 1
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def version(self):
+        # includes the key so version-keyed caches never mix users up
+        if not self.exists():
+            return (self.key, 0)
+        return (self.key, os.stat(self.path).st_mtime_ns)
+
+    def load(self):
+        if not self.exists():
+            return None
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, data):
+        with self.lock:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+            if BACKUPS:
+                self.backups.snapshot(data)
+
+
+# ==================================================
+# 🗄 STORE POOL
+# ==================================================
+class StorePool:
+    """Open Store handles, least recently used evicted past `capacity`.
+
+    The pool lock only guards the lookup table; all file I/O happens under
+    the individual store's lock.
+    """
+
+    def __init__(self, capacity=POOL_SIZE, root=DATA_ROOT):
+        self.capacity = capacity
+        self.root = root
+        self.stores = OrderedDict()
+        self.lock = threading.Lock()
+
+    def path_for(self, key):
+        if not key:
+            return DEFAULT_FILE
+        return os.path.join(self.root, key, DEFAULT_FILE)
+
+    def get(self, user):
+        key = user_key(user)
+        with self.lock:
+            store = self.stores.get(key)
+            if store is None:
+                store = Store(key, self.path_for(key))
+                self.stores[key] = store
+                while len(self.stores) > self.capacity:
+                    self.stores.popitem(last=False)
+            else:
+                self.stores.move_to_end(key)
+            return store
+
+
+@st.cache_resource
+def store_pool():
+    return StorePool()
+
+
+def _switch_user():
+    st.session_state.user = user_key(st.session_state._user_box)
+
+
+def current_store():
+    """The store for this session's user (?user=… or the sidebar box)."""
+    if "user" not in st.session_state:
+        st.session_state.user = user_key(st.query_params.get("user", ""))
+
+    st.sidebar.text_input(
+        "👤 User",
+        value=st.session_state.user,
+        key="_user_box",
+        on_change=_switch_user,
+        help="Each user gets a separate planner. Leave empty for the shared one."
+    )
+    return store_pool().get(st.session_state.user)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.forecast import daily_spend
+from utils.store import POOL_SIZE
+
+MAX_POINTS = 2000
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling; returns kept indices.
+
+    Keeps the first and last point and, per bucket, the point that forms
+    the largest triangle with the previous pick and the next bucket's mean,
+    so spikes survive while flat stretches are thinned out.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(area.argmax())
+        keep[b + 1] = prev
+
+    return keep
+
+
+def spending_timeline(expenses, freq="D", max_points=MAX_POINTS):
+    """Spend per day ("D") or week ("W"), downsampled to at most max_points."""
+    series = daily_spend(expenses)
+    if series.empty:
+        return pd.DataFrame(columns=["date", "amount"])
+
+    if freq == "W":
+        series = series.resample("W-MON", label="left", closed="left").sum()
+
+    keep = lttb(series.index.asi8, series.to_numpy(), max_points)
+    return pd.DataFrame({"date": series.index[keep], "amount": series.to_numpy()[keep]})
+
+
+# a few freq / point-count variants per user, for every pooled user
+@st.cache_data(show_spinner=False, max_entries=POOL_SIZE * 4)
+def cached_timeline(version, freq, max_points, _expenses):
+    # _expenses is not hashed; the data version stands in for it
+    return spending_timeline(_expenses, freq, max_points)